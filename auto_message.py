@@ -1,16 +1,461 @@
 import requests
+import atexit
+import bisect
+import contextlib
+import functools
+import json
+import logging
+import mimetypes
+import os
+import queue
+import sys
 import time
 import random
 import threading
 import uuid
-from datetime import datetime, time as dt_time
-from flask import Flask, render_template, request, jsonify, session
+from collections import OrderedDict, namedtuple
+from datetime import datetime, timedelta, time as dt_time
+from flask import (
+    Flask,
+    Response,
+    g,
+    render_template,
+    request,
+    jsonify,
+    send_from_directory,
+    session,
+)
+from config_store import ConfigStore
+from log_journal import LogJournal
+from message_stats import MessageStats
+from metrics import Counter, Gauge, Histogram, Registry
+from models import (
+    Account,
+    Accounts,
+    Config,
+    compile_schedule,
+    format_time_of_day,
+    parse_time_of_day,
+)
+from snapshot import SnapshotStore
+
+# Optional SQLite persistence of accounts and configs (set GRAPHITE_DB to enable)
+config_store = None
+if os.environ.get("GRAPHITE_DB"):
+    config_store = ConfigStore(os.environ["GRAPHITE_DB"])
+
+# Optional on-disk console history (set GRAPHITE_LOG_DIR to enable)
+log_journal = None
+if os.environ.get("GRAPHITE_LOG_DIR"):
+    log_journal = LogJournal(os.environ["GRAPHITE_LOG_DIR"])
+
+# Optional snapshots of all session state (set GRAPHITE_SNAPSHOT to enable)
+snapshot_store = None
+if os.environ.get("GRAPHITE_SNAPSHOT"):
+    snapshot_store = SnapshotStore(os.environ["GRAPHITE_SNAPSHOT"])
+
+logger = logging.getLogger("graphite")
 
 app = Flask(__name__)
-app.secret_key = "discord-bot-" + str(uuid.uuid4())
+# Session cookies must survive restarts to find the stored sessions again
+if config_store:
+    app.secret_key = config_store.get_secret_key()
+elif snapshot_store and snapshot_store.meta.get("secret_key"):
+    app.secret_key = snapshot_store.meta["secret_key"]
+else:
+    app.secret_key = "discord-bot-" + str(uuid.uuid4())
 
-sessions_data = {}
 max_logs = 500
+# Most entries a JSON /api/logs/history response holds; format=text streams
+# the full history instead
+max_log_history = 10000
+
+# Simulation limits
+max_simulation_hours = 24 * 7
+max_simulation_entries = 10000
+
+# Random window mode draws every send time up front, so bound how many
+max_messages_count = 1440
+
+# Session eviction settings
+max_sessions = 1000
+session_idle_ttl = 24 * 60 * 60
+# Requests only evict from their own shard, so all shards are swept this often
+session_sweep_interval = 5 * 60
+
+# Server-Sent Events settings
+event_queue_size = 1000
+event_keepalive_interval = 15
+# Every open stream holds a server thread; None means no limit (see
+# limit_event_streams)
+event_stream_slots = None
+
+# Seconds before a Discord API call is abandoned, so a stalled request
+# cannot keep a bot thread from stopping
+discord_request_timeout = 10
+
+# Bundles written by build_assets.py; their names change with their content
+asset_dir = os.path.join(app.static_folder, "dist")
+asset_max_age = 365 * 24 * 60 * 60
+
+
+LogRecord = namedtuple("LogRecord", "timestamp level kind session_id message")
+
+LOG_LEVELS = {"info": logging.INFO, "warning": logging.WARNING, "error": logging.ERROR}
+
+
+class LogBuffer:
+    """Fixed-capacity ring buffer of log records numbered with sequence ids"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._records = [None] * capacity
+        self._next_seq = 1
+
+    def __len__(self):
+        return min(self._next_seq - 1, self.capacity)
+
+    @property
+    def first_seq(self):
+        """Sequence number of the oldest record still held"""
+        return max(1, self._next_seq - self.capacity)
+
+    @property
+    def last_seq(self):
+        """Sequence number of the newest record (0 when empty)"""
+        return self._next_seq - 1
+
+    def append(self, record):
+        """Store a record, overwriting the oldest one when full, and return its seq"""
+        seq = self._next_seq
+        self._records[seq % self.capacity] = record
+        self._next_seq = seq + 1
+        return seq
+
+    def since(self, after, predicate=None):
+        """Return (entries, gap) for records newer than `after`
+
+        entries is a list of (seq, record) tuples, limited to the records
+        matching `predicate` if one is given. gap is True when records
+        between `after` and the oldest retained one were already overwritten,
+        or when `after` is ahead of this buffer (e.g. from before a restart).
+        """
+        start = max(after + 1, self.first_seq)
+        gap = after + 1 < start or after > self.last_seq
+        entries = [
+            (seq, self._records[seq % self.capacity])
+            for seq in range(start, self._next_seq)
+        ]
+        if predicate:
+            entries = [(seq, record) for seq, record in entries if predicate(record)]
+        return entries, gap
+
+    def records(self):
+        """Return all retained records, oldest first"""
+        return [record for _, record in self.since(0)[0]]
+
+    @classmethod
+    def restore(cls, capacity, records, last_seq):
+        """Rebuild a buffer from its records and the seq of the newest one"""
+        records = records[-capacity:]
+        buffer = cls(capacity)
+        buffer._next_seq = last_seq - len(records) + 1
+        for record in records:
+            buffer.append(record)
+        return buffer
+
+
+@functools.lru_cache(maxsize=4096)
+def format_timestamp(seconds):
+    """Format a whole-second Unix timestamp in local time"""
+    return datetime.fromtimestamp(seconds).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def format_record(record):
+    """Render a log record as a console line"""
+    return f"[{format_timestamp(int(record.timestamp))}] {record.message}"
+
+
+def serialize_record(seq, record):
+    """Convert a log record to the JSON form sent to clients"""
+    return {
+        "seq": seq,
+        "level": record.level,
+        "kind": record.kind,
+        "line": format_record(record),
+    }
+
+
+def make_log_filter(level=None, kinds=None, text=None):
+    """Build a predicate over log records, or None when nothing is filtered
+
+    `level` is a minimum level, `kinds` a comma-separated list of kinds
+    and `text` a case-insensitive substring of the message. Raises
+    ValueError for an unknown level.
+    """
+    if not (level or kinds or text):
+        return None
+    if level and level not in LOG_LEVELS:
+        raise ValueError(f"Unknown level: {level!r}")
+
+    min_level = LOG_LEVELS[level] if level else 0
+    kinds = set(kinds.split(",")) if kinds else None
+    text = text.lower() if text else None
+
+    def matches(record):
+        return (
+            LOG_LEVELS[record.level] >= min_level
+            and (kinds is None or record.kind in kinds)
+            and (text is None or text in record.message.lower())
+        )
+
+    return matches
+
+
+class SystemClock:
+    """Real time: wall clock, monotonic clock and interruptible waits"""
+
+    def now(self):
+        return datetime.now()
+
+    def time(self):
+        return time.time()
+
+    def monotonic(self):
+        return time.monotonic()
+
+    def wait(self, event, timeout):
+        """Block until `event` is set or `timeout` passes; return event state"""
+        return event.wait(timeout)
+
+
+class VirtualClock:
+    """Simulated time that jumps forward instead of sleeping
+
+    Once `horizon` seconds have been simulated, the next wait sets its
+    event, which stops the mode loop waiting on it.
+    """
+
+    def __init__(self, start, horizon):
+        self.start = start
+        self.horizon = horizon
+        self.elapsed = 0.0
+
+    def now(self):
+        return self.start + timedelta(seconds=self.elapsed)
+
+    def time(self):
+        return self.start.timestamp() + self.elapsed
+
+    def monotonic(self):
+        return self.elapsed
+
+    def wait(self, event, timeout):
+        if event.is_set():
+            return True
+        if self.elapsed + timeout >= self.horizon:
+            self.elapsed = self.horizon
+            event.set()
+            return True
+        self.elapsed += timeout
+        return False
+
+
+system_clock = SystemClock()
+
+
+class SessionStore:
+    """Sharded session registry with idle-TTL and max-size (LRU) eviction
+
+    Sessions are spread over shards by id, each with its own lock, so
+    requests from different sessions rarely contend and no global lock is
+    taken on the request path. Sessions whose bot is running or that have
+    an open event stream are never evicted. Lookups with `in`, `[]` and
+    `get` do not count as activity; only `get_or_create` refreshes a
+    session's idle timer.
+    """
+
+    def __init__(self, max_size, idle_ttl, shard_count=16):
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self._shard_max_size = max(1, -(-max_size // shard_count))
+        self._shards = [OrderedDict() for _ in range(shard_count)]
+        self._locks = [threading.Lock() for _ in range(shard_count)]
+
+    def _shard_index(self, session_id):
+        return hash(session_id) % len(self._shards)
+
+    def __contains__(self, session_id):
+        return session_id in self._shards[self._shard_index(session_id)]
+
+    def __getitem__(self, session_id):
+        return self._shards[self._shard_index(session_id)][session_id]
+
+    def __len__(self):
+        return sum(len(shard) for shard in self._shards)
+
+    def get(self, session_id, default=None):
+        return self._shards[self._shard_index(session_id)].get(session_id, default)
+
+    def items(self):
+        items = []
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                items.extend(shard.items())
+        return items
+
+    def get_or_create(self, session_id, factory):
+        """Return a session's data, creating it with `factory(session_id)` if needed"""
+        index = self._shard_index(session_id)
+        shard = self._shards[index]
+        now = time.monotonic()
+        with self._locks[index]:
+            session_data = shard.get(session_id)
+            if session_data is None:
+                session_data = factory(session_id)
+                shard[session_id] = session_data
+            else:
+                shard.move_to_end(session_id)
+            session_data["last_seen"] = now
+            self._evict_locked(shard, now, keep=session_id)
+        return session_data
+
+    def evict(self):
+        """Drop idle and excess sessions; return the evicted ids"""
+        now = time.monotonic()
+        victims = []
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                victims.extend(self._evict_locked(shard, now))
+        return victims
+
+    def _evict_locked(self, shard, now, keep=None):
+        """Evict from one shard, never the session `keep`
+
+        When every other session is protected the shard is left over its
+        size limit rather than dropping the session being handed out.
+        """
+        excess = len(shard) - self._shard_max_size
+        victims = []
+        # Oldest first: stop at the first session that is neither expired
+        # nor needed to get back under the size limit
+        for session_id, session_data in shard.items():
+            expired = now - session_data["last_seen"] > self.idle_ttl
+            if not expired and len(victims) >= excess:
+                break
+            if session_id == keep:
+                continue
+            if session_data["bot_running"] or session_data["subscribers"]:
+                continue
+            victims.append(session_id)
+
+        for session_id in victims:
+            del shard[session_id]
+        return victims
+
+
+def estimate_size(obj):
+    """Estimate the memory used by a session value in bytes"""
+    if isinstance(obj, Accounts):
+        return estimate_size(obj.to_dicts())
+    if isinstance(obj, MessageStats):
+        return estimate_size(obj.to_dict())
+    if isinstance(obj, LogBuffer):
+        return sys.getsizeof(obj._records) + sum(
+            sys.getsizeof(record) + sys.getsizeof(record.message)
+            for record in obj.records()
+        )
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(
+            estimate_size(key) + estimate_size(value) for key, value in obj.items()
+        )
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(estimate_size(item) for item in obj)
+    if isinstance(obj, (str, bytes, int, float, bool)) or obj is None:
+        return sys.getsizeof(obj)
+    # Threads, events and queues are shared runtime objects, not session data
+    return 0
+
+
+def estimate_session_bytes(session_data):
+    """Estimate the memory held by one session's accounts, logs and stats"""
+    return sum(
+        estimate_size(session_data[key])
+        for key in ("accounts", "console_logs", "message_stats")
+    )
+
+
+sessions_data = SessionStore(max_sessions, session_idle_ttl)
+
+# Prometheus-style metrics at /metrics (set GRAPHITE_METRICS=1 to enable)
+metrics_enabled = os.environ.get("GRAPHITE_METRICS") == "1"
+metrics_registry = Registry()
+request_seconds = metrics_registry.register(
+    Histogram(
+        "graphite_request_duration_seconds",
+        "Time spent handling API requests",
+        ("method", "route"),
+    )
+)
+discord_request_seconds = metrics_registry.register(
+    Histogram(
+        "graphite_discord_request_duration_seconds",
+        "Time spent in Discord API calls",
+        ("call",),
+    )
+)
+dry_run_sends = metrics_registry.register(
+    Counter(
+        "graphite_dry_run_sends_total",
+        "Messages that were only simulated because of dry-run mode",
+        ("simulation",),
+    )
+)
+metrics_registry.register(
+    Gauge("graphite_sessions", "Sessions held in memory", lambda: len(sessions_data))
+)
+metrics_registry.register(
+    Gauge(
+        "graphite_bot_threads",
+        "Bot threads currently alive",
+        lambda: sum(
+            1
+            for _, session_data in sessions_data.items()
+            if session_data["bot_thread"] and session_data["bot_thread"].is_alive()
+        ),
+    )
+)
+metrics_registry.register(
+    Gauge(
+        "graphite_session_log_lines",
+        "Lines held in each session's log buffer",
+        lambda: [
+            ((session_id[:8],), len(session_data["console_logs"]))
+            for session_id, session_data in sessions_data.items()
+        ],
+        ("session",),
+    )
+)
+
+
+def timed(histogram, *labels):
+    """Time a block into a histogram, or do nothing when metrics are disabled"""
+    return histogram.time(*labels) if metrics_enabled else contextlib.nullcontext()
+
+
+if metrics_enabled:
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def observe_request(response):
+        route = request.url_rule.rule if request.url_rule else "<unmatched>"
+        request_seconds.observe(
+            time.perf_counter() - g.request_started, request.method, route
+        )
+        return response
 
 
 def get_default_config():
@@ -32,65 +477,292 @@ def get_default_config():
     }
 
 
+def create_session_data(session_id):
+    """Create the data for a session, restoring its state if it was stored
+
+    Accounts come from the config store when it has them, as it is written
+    shortly after every change; the snapshot provides everything else.
+    """
+    stored = config_store.load_session(session_id) if config_store else None
+    snapshot = snapshot_store.load(session_id) if snapshot_store else None
+    if snapshot and not (stored and stored[1]):
+        stored = snapshot["active_account_id"], snapshot["accounts"]
+
+    if stored and stored[1]:
+        active_account_id, accounts = stored
+        accounts = Accounts.from_dicts(
+            accounts, active_account_id, get_default_config()
+        )
+    else:
+        config = Config(**get_default_config())
+        accounts = Accounts([Account(str(uuid.uuid4()), "Config 1", config)])
+
+    return {
+        "accounts": accounts,
+        "bot_running": False,
+        "lock": threading.RLock(),
+        "clock": system_clock,
+        "rng": random,
+        "stop_event": threading.Event(),
+        "bot_thread": None,
+        "console_logs": restore_logs(session_id, snapshot),
+        "message_stats": (
+            MessageStats.from_dict(snapshot["message_stats"])
+            if snapshot
+            else MessageStats()
+        ),
+        "subscribers": [],
+        "last_seen": time.monotonic(),
+    }
+
+
+def restore_logs(session_id, snapshot):
+    """Rebuild a session's console buffer from its snapshot, if any"""
+    if not snapshot:
+        return LogBuffer(max_logs)
+    records = [
+        LogRecord(timestamp, level, kind, session_id, message)
+        for timestamp, level, kind, message in snapshot["logs"]
+    ]
+    return LogBuffer.restore(max_logs, records, snapshot["last_seq"])
+
+
+def encode_session_state(session_data):
+    """Serialize the part of a session's data kept in snapshots"""
+    with session_data["lock"]:
+        console_logs = session_data["console_logs"]
+        state = {
+            "accounts": session_data["accounts"].to_dicts(),
+            "active_account_id": session_data["accounts"].active_id,
+            "message_stats": session_data["message_stats"].to_dict(),
+            "logs": [
+                (record.timestamp, record.level, record.kind, record.message)
+                for record in console_logs.records()
+            ],
+            "last_seq": console_logs.last_seq,
+        }
+        return json.dumps(state, separators=(",", ":")).encode()
+
+
+def collect_snapshot():
+    """Return the (meta, sessions) pair written by the snapshot store"""
+    now = time.time()
+    sessions = (
+        (session_id, now, encode_session_state(session_data))
+        for session_id, session_data in sessions_data.items()
+    )
+    return {"secret_key": app.secret_key}, sessions
+
+
+if snapshot_store:
+    snapshot_store.start(collect_snapshot)
+
+# Set once shutdown() starts; no bots are started after that
+shutting_down = threading.Event()
+shutdown_lock = threading.Lock()
+
+
+def shutdown(timeout=10):
+    """Stop every bot and flush the stores before the process exits
+
+    Signals each running bot to stop, waits up to `timeout` seconds in
+    total for them to finish, ends open event streams and then writes out
+    the config store, snapshot and log journal. Only the first call does
+    anything, so servers can call it from their own exit path as well.
+    """
+    with shutdown_lock:
+        if shutting_down.is_set():
+            return
+        shutting_down.set()
+
+    all_sessions = [session_data for _, session_data in sessions_data.items()]
+    with simulations_lock:
+        all_sessions.extend(list(simulations.values()))
+    threads = []
+    for session_data in all_sessions:
+        with session_data["lock"]:
+            session_data["stop_event"].set()
+            thread = session_data.get("bot_thread")
+            if thread and thread.is_alive():
+                threads.append(thread)
+
+    deadline = time.monotonic() + timeout
+    for thread in threads:
+        thread.join(max(0, deadline - time.monotonic()))
+    running = sum(thread.is_alive() for thread in threads)
+    if running:
+        logger.warning("%d bot(s) still running after %ss", running, timeout)
+    elif threads:
+        logger.info("Stopped %d bot(s)", len(threads))
+
+    # After the bots, so streams still deliver their "Bot stopped." lines
+    for _, session_data in sessions_data.items():
+        with session_data["lock"]:
+            for subscriber in session_data["subscribers"]:
+                try:
+                    subscriber.put_nowait(("shutdown", {}))
+                except queue.Full:
+                    with subscriber.mutex:
+                        subscriber.queue.clear()
+                    subscriber.put_nowait(("shutdown", {}))
+
+    if config_store:
+        config_store.close()
+    if snapshot_store:
+        snapshot_store.close(collect_snapshot)
+    if log_journal:
+        log_journal.close()
+
+
+atexit.register(shutdown)
+
+
+def sweep_sessions():
+    """Evict idle sessions every session_sweep_interval until shutdown"""
+    while not shutting_down.wait(session_sweep_interval):
+        evicted = sessions_data.evict()
+        if evicted:
+            logger.info("Evicted %d idle session(s)", len(evicted))
+
+
+threading.Thread(target=sweep_sessions, daemon=True).start()
+
+
 def get_session_data():
     """Get or create session data for current session"""
     if "session_id" not in session:
         session["session_id"] = str(uuid.uuid4())
 
-    session_id = session["session_id"]
+    return sessions_data.get_or_create(session["session_id"], create_session_data)
+
+
+def create_simulation_data(clock, seed=None):
+    """Create throwaway session data for a simulated run"""
+    return {
+        "lock": threading.RLock(),
+        "clock": clock,
+        "rng": random.Random(seed),
+        "stop_event": threading.Event(),
+        "bot_running": True,
+        "console_logs": LogBuffer(max_logs),
+        "message_stats": MessageStats(),
+        "subscribers": [],
+        "timeline": [],
+    }
+
+
+# Simulated sessions in progress, kept out of sessions_data
+simulations = {}
+simulations_lock = threading.Lock()
+
+
+def find_session(session_id):
+    """Get a live or simulated session's data without creating it"""
+    return sessions_data.get(session_id) or simulations.get(session_id)
 
-    if session_id not in sessions_data:
-        sessions_data[session_id] = {
-            "accounts": [
-                {
-                    "id": str(uuid.uuid4()),
-                    "name": "Config 1",
-                    "config": get_default_config(),
-                }
-            ],
-            "active_account_id": None,
-            "bot_running": False,
-            "stop_bot": False,
-            "bot_thread": None,
-            "console_logs": [],
-            "message_stats": {},
-        }
-        sessions_data[session_id]["active_account_id"] = sessions_data[session_id][
-            "accounts"
-        ][0]["id"]
 
-    return sessions_data[session_id]
+def record_timeline(session_data, event, **details):
+    """Add an entry to a simulation's timeline (no-op for real sessions)"""
+    timeline = session_data.get("timeline")
+    if timeline is None:
+        return
+    timeline.append(
+        {"time": session_data["clock"].now().isoformat(), "event": event, **details}
+    )
+    if len(timeline) >= max_simulation_entries:
+        session_data["stop_event"].set()
+
+
+def persist_session(session_id, session_data):
+    """Queue a session's accounts for the config store, if it is enabled"""
+    if config_store:
+        with session_data["lock"]:
+            accounts = session_data["accounts"]
+            config_store.save_session(
+                session_id, accounts.active_id, accounts.to_dicts()
+            )
 
 
 def get_active_account(session_data):
     """Get the currently active account"""
-    active_id = session_data.get("active_account_id")
-    for account in session_data["accounts"]:
-        if account["id"] == active_id:
-            return account
-    return session_data["accounts"][0] if session_data["accounts"] else None
+    return session_data["accounts"].active
 
 
-def log(message, session_id):
-    """Log message to both console and web interface"""
-    if session_id not in sessions_data:
+def publish_event(session_id, event, data):
+    """Push an event to every stream subscribed to a session"""
+    session_data = find_session(session_id)
+    if not session_data:
         return
 
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_entry = f"[{timestamp}] {message}"
-    print(f"[Session {session_id[:8]}] {log_entry}")
-    sessions_data[session_id]["console_logs"].append(log_entry)
-    if len(sessions_data[session_id]["console_logs"]) > max_logs:
-        sessions_data[session_id]["console_logs"] = sessions_data[session_id][
-            "console_logs"
-        ][-max_logs:]
+    # Holding the session lock keeps events in the order they happened
+    with session_data["lock"]:
+        for subscriber in session_data["subscribers"]:
+            try:
+                subscriber.put_nowait((event, data))
+            except queue.Full:
+                # Slow client: drop its backlog and ask it to resynchronize
+                with subscriber.mutex:
+                    subscriber.queue.clear()
+                subscriber.put_nowait(("resync", {}))
 
 
-def get_random_message(config):
+def format_sse(event, data, event_id=None):
+    """Format a Server-Sent Events message"""
+    id_line = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{id_line}event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def parse_timestamp(value):
+    """Parse a Unix timestamp or ISO datetime query argument, or None
+
+    Raises ValueError for anything else.
+    """
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def parse_seq(value):
+    """Parse a log sequence cursor, treating missing or invalid values as 0"""
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def log(message, session_id, level="info", kind="bot"):
+    """Log message to both console and web interface
+
+    The entry is stored as a LogRecord; turning it into text is left to
+    whoever reads it. `level` is "info", "warning" or "error" and `kind`
+    groups entries for filtering ("bot", "config", "schedule", "delay"
+    or "send").
+    """
+    session_data = find_session(session_id)
+    if not session_data:
+        return
+
+    record = LogRecord(session_data["clock"].time(), level, kind, session_id, message)
+    if "timeline" not in session_data:
+        logger.log(LOG_LEVELS[level], "[Session %s] %s", session_id[:8], message)
+    with session_data["lock"]:
+        seq = session_data["console_logs"].append(record)
+        if session_data["subscribers"]:
+            publish_event(session_id, "log", serialize_record(seq, record))
+    # Outside the session lock: the journal has its own, and disk writes
+    # should not hold up the session's requests
+    if log_journal and "timeline" not in session_data:
+        log_journal.append(session_id, record.timestamp, level, kind, message)
+
+
+def get_random_message(config, rng=random):
     """Get a random message from the messages list"""
     if not config["messages"]:
         return ""
-    return random.choice(config["messages"])
+    return rng.choice(config["messages"])
 
 
 def trigger_typing(token, channel_id):
@@ -99,21 +771,36 @@ def trigger_typing(token, channel_id):
     headers = {"Authorization": token}
 
     try:
-        requests.post(url, headers=headers)
+        with timed(discord_request_seconds, "trigger_typing"):
+            requests.post(url, headers=headers, timeout=discord_request_timeout)
     except Exception:
         pass
 
 
 def send_message(token, channel_id, message, session_id, dry_run=False):
     """Send a message to a Discord channel"""
-    if session_id in sessions_data:
-        message_stats = sessions_data[session_id]["message_stats"]
-        if message not in message_stats:
-            message_stats[message] = 0
-        message_stats[message] += 1
+    session_data = find_session(session_id)
+    if session_data:
+        record_timeline(session_data, "send", message=message)
+        with session_data["lock"]:
+            message_stats = session_data["message_stats"]
+            series = message_stats.record(message, session_data["clock"].time())
+            publish_event(
+                session_id,
+                "stats",
+                {
+                    "id": series.id,
+                    "message": message,
+                    "count": series.count,
+                    "version": message_stats.version,
+                },
+            )
 
     if dry_run:
-        log(f"[DRY RUN] Would send message: {message}", session_id)
+        if metrics_enabled:
+            simulated = bool(session_data) and "timeline" in session_data
+            dry_run_sends.inc("true" if simulated else "false")
+        log(f"[DRY RUN] Would send message: {message}", session_id, kind="send")
         return True
 
     url = f"https://discord.com/api/v9/channels/{channel_id}/messages"
@@ -121,62 +808,125 @@ def send_message(token, channel_id, message, session_id, dry_run=False):
     data = {"content": message}
 
     try:
-        response = requests.post(url, headers=headers, json=data)
+        with timed(discord_request_seconds, "send_message"):
+            response = requests.post(
+                url, headers=headers, json=data, timeout=discord_request_timeout
+            )
         if response.status_code == 200:
-            log(f"Sent: {message}", session_id)
+            log(f"Sent: {message}", session_id, kind="send")
             return True
         else:
-            log(f"Failed to send message. Status: {response.status_code}", session_id)
-            log(f"Response: {response.text}", session_id)
+            log(
+                f"Failed to send message. Status: {response.status_code}",
+                session_id,
+                "error",
+                "send",
+            )
+            log(f"Response: {response.text}", session_id, "error", "send")
             return False
     except Exception as e:
-        log(f"Error: {str(e)}", session_id)
+        log(f"Error: {str(e)}", session_id, "error", "send")
+        return False
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_window(window_start, window_end):
+    """Compile a time window into (start minute, duration in minutes)
+
+    A window whose end is before its start crosses midnight.
+    """
+    start = parse_time_of_day(window_start)
+    duration = (parse_time_of_day(window_end) - start) % (24 * 60)
+    return start, duration
+
+
+def is_valid_schedule(send_times):
+    """Check that every entry of a list is a valid "HH:MM" time"""
+    try:
+        compile_schedule(send_times)
+    except (TypeError, ValueError):
         return False
+    return True
 
 
-def get_next_send_time(config):
+def get_next_send_time(config, now=None):
     """Get the next scheduled send time"""
-    if not config["send_times"]:
+    if isinstance(config, Config):
+        schedule = config.schedule
+    else:
+        schedule = compile_schedule(config["send_times"])
+    if not schedule:
         return None
 
-    now = datetime.now()
-    today = now.date()
-
-    for send_time in config["send_times"]:
-        hour, minute = map(int, send_time.split(":"))
-        scheduled = datetime.combine(today, dt_time(hour, minute))
-        if scheduled > now:
-            return scheduled
+    now = now or datetime.now()
+    midnight = datetime.combine(now.date(), dt_time())
+
+    # First send time strictly after now, else the first one tomorrow
+    index = bisect.bisect_right(schedule, now.hour * 60 + now.minute)
+    if index < len(schedule):
+        return midnight + timedelta(minutes=schedule[index])
+    return midnight + timedelta(days=1, minutes=schedule[0])
+
+
+def get_window_bounds(window, now):
+    """Return (start, end) datetimes of the window in progress or the next one"""
+    start_minute, duration = window
+    midnight = datetime.combine(now.date(), dt_time())
+
+    # Yesterday's window may still be running if it crosses midnight
+    for days in (-1, 0, 1):
+        window_start = midnight + timedelta(days=days, minutes=start_minute)
+        window_end = window_start + timedelta(minutes=duration)
+        if now <= window_end:
+            return window_start, window_end
+
+
+def wait_until(session_data, deadline):
+    """Wait until a monotonic clock deadline; return True if stopped first"""
+    clock = session_data["clock"]
+    stop_event = session_data["stop_event"]
+    while True:
+        remaining = deadline - clock.monotonic()
+        if remaining <= 0:
+            return stop_event.is_set()
+        if clock.wait(stop_event, remaining):
+            return True
 
-    from datetime import timedelta
 
-    tomorrow = today + timedelta(days=1)
-    hour, minute = map(int, config["send_times"][0].split(":"))
-    return datetime.combine(tomorrow, dt_time(hour, minute))
+def wait_for(session_data, seconds):
+    """Wait for a number of seconds; return True if stopped first"""
+    return wait_until(session_data, session_data["clock"].monotonic() + seconds)
 
 
 def apply_delay(config, session_data, session_id):
     """Apply random delay if enabled"""
     if config["delay_enabled"]:
-        delay = random.randint(config["min_delay"], config["max_delay"])
-        log(f"Adding random delay of {delay} seconds before sending...", session_id)
+        delay = session_data["rng"].randint(config["min_delay"], config["max_delay"])
+        log(
+            f"Adding random delay of {delay} seconds before sending...",
+            session_id,
+            kind="delay",
+        )
+        record_timeline(session_data, "delay", seconds=delay)
 
         if not config.get("dry_run", False):
             trigger_typing(config["token"], config["channel_id"])
 
-        elapsed = 0
-        next_typing = 9
+        start = session_data["clock"].monotonic()
+        deadline = start + delay
 
-        while elapsed < delay and not session_data["stop_bot"]:
-            sleep_time = min(0.1, delay - elapsed)
-            time.sleep(sleep_time)
-            elapsed += sleep_time
+        if config.get("dry_run", False):
+            return wait_until(session_data, deadline)
 
-            if not config.get("dry_run", False) and elapsed >= next_typing:
-                trigger_typing(config["token"], config["channel_id"])
-                next_typing += 9
+        # Discord's typing indicator lasts about 10 seconds, so refresh it
+        next_typing = start + 9
+        while next_typing < deadline:
+            if wait_until(session_data, next_typing):
+                return True
+            trigger_typing(config["token"], config["channel_id"])
+            next_typing += 9
 
-        return session_data["stop_bot"]
+        return wait_until(session_data, deadline)
     return False
 
 
@@ -187,14 +937,14 @@ def run_scheduled_mode(config, session_data, session_id):
     for t in config["send_times"]:
         log(f"  - {t}", session_id)
 
-    while not session_data["stop_bot"]:
-        next_send = get_next_send_time(config)
+    while not session_data["stop_event"].is_set():
+        next_send = get_next_send_time(config, session_data["clock"].now())
         if not next_send:
-            log("No send times configured. Waiting...", session_id)
-            time.sleep(10)
+            log("No send times configured. Waiting...", session_id, "warning")
+            wait_for(session_data, 10)
             continue
 
-        now = datetime.now()
+        now = session_data["clock"].now()
         wait_seconds = (next_send - now).total_seconds()
 
         delay_info = ""
@@ -206,22 +956,17 @@ def run_scheduled_mode(config, session_data, session_id):
         log(
             f"Next message scheduled for: {next_send.strftime('%Y-%m-%d %H:%M:%S')}{delay_info}",
             session_id,
+            kind="schedule",
         )
-        log(f"Waiting {wait_seconds/3600:.2f} hours...", session_id)
-
-        elapsed = 0
-        while elapsed < wait_seconds and not session_data["stop_bot"]:
-            sleep_time = min(1, wait_seconds - elapsed)
-            time.sleep(sleep_time)
-            elapsed += sleep_time
+        log(f"Waiting {wait_seconds/3600:.2f} hours...", session_id, kind="schedule")
 
-        if session_data["stop_bot"]:
+        if wait_for(session_data, wait_seconds):
             break
 
         if apply_delay(config, session_data, session_id):
             break
 
-        message = get_random_message(config)
+        message = get_random_message(config, session_data["rng"])
         send_message(
             config["token"],
             config["channel_id"],
@@ -236,11 +981,11 @@ def run_spam_mode(config, session_data, session_id):
     log(f"Mode: Spam", session_id)
     log(f"Interval: {config['spam_interval']} seconds between messages", session_id)
 
-    while not session_data["stop_bot"]:
+    while not session_data["stop_event"].is_set():
         if apply_delay(config, session_data, session_id):
             break
 
-        message = get_random_message(config)
+        message = get_random_message(config, session_data["rng"])
         send_message(
             config["token"],
             config["channel_id"],
@@ -249,64 +994,53 @@ def run_spam_mode(config, session_data, session_id):
             config.get("dry_run", False),
         )
 
-        elapsed = 0
-        interval = config["spam_interval"]
-        while elapsed < interval and not session_data["stop_bot"]:
-            sleep_time = min(1, interval - elapsed)
-            time.sleep(sleep_time)
-            elapsed += sleep_time
+        if wait_for(session_data, config["spam_interval"]):
+            break
 
 
 def run_random_window_mode(config, session_data, session_id):
     """Run bot in random window mode (X messages randomly within time window)"""
-    from datetime import timedelta
-
     log(f"Mode: Random Window", session_id)
     log(f"Window: {config['window_start']} - {config['window_end']}", session_id)
     log(f"Messages: {config['messages_count']} messages", session_id)
 
-    start_hour, start_min = map(int, config["window_start"].split(":"))
-    end_hour, end_min = map(int, config["window_end"].split(":"))
+    clock = session_data["clock"]
+    window = compile_window(config["window_start"], config["window_end"])
+    window_start, window_end = get_window_bounds(window, clock.now())
 
-    today = datetime.now().date()
-    window_start = datetime.combine(today, dt_time(start_hour, start_min))
-    window_end = datetime.combine(today, dt_time(end_hour, end_min))
-
-    if datetime.now() > window_end:
-        tomorrow = today + timedelta(days=1)
-        window_start = datetime.combine(tomorrow, dt_time(start_hour, start_min))
-        window_end = datetime.combine(tomorrow, dt_time(end_hour, end_min))
-    elif datetime.now() < window_start:
-        wait_seconds = (window_start - datetime.now()).total_seconds()
+    if clock.now() < window_start:
+        wait_seconds = (window_start - clock.now()).total_seconds()
         log(
             f"Waiting until window starts: {window_start.strftime('%Y-%m-%d %H:%M:%S')}",
             session_id,
+            kind="schedule",
         )
-        elapsed = 0
-        while elapsed < wait_seconds and not session_data["stop_bot"]:
-            sleep_time = min(1, wait_seconds - elapsed)
-            time.sleep(sleep_time)
-            elapsed += sleep_time
+        if wait_for(session_data, wait_seconds):
+            return
 
-    if session_data["stop_bot"]:
+    if session_data["stop_event"].is_set():
         return
 
     window_duration = (window_end - window_start).total_seconds()
     send_times = sorted(
         [
-            window_start.timestamp() + random.uniform(0, window_duration)
+            window_start.timestamp() + session_data["rng"].uniform(0, window_duration)
             for _ in range(config["messages_count"])
         ]
     )
 
-    log(f"Generated {len(send_times)} random send times within window", session_id)
+    log(
+        f"Generated {len(send_times)} random send times within window",
+        session_id,
+        kind="schedule",
+    )
 
     for send_time in send_times:
-        if session_data["stop_bot"]:
+        if session_data["stop_event"].is_set():
             break
 
         send_datetime = datetime.fromtimestamp(send_time)
-        now = datetime.now()
+        now = clock.now()
 
         if send_datetime > now:
             wait_seconds = (send_datetime - now).total_seconds()
@@ -320,22 +1054,19 @@ def run_random_window_mode(config, session_data, session_id):
             log(
                 f"Next message at: {send_datetime.strftime('%Y-%m-%d %H:%M:%S')}{delay_info}",
                 session_id,
+                kind="schedule",
+            )
+            log(
+                f"Waiting {wait_seconds/60:.1f} minutes...", session_id, kind="schedule"
             )
-            log(f"Waiting {wait_seconds/60:.1f} minutes...", session_id)
-
-            elapsed = 0
-            while elapsed < wait_seconds and not session_data["stop_bot"]:
-                sleep_time = min(1, wait_seconds - elapsed)
-                time.sleep(sleep_time)
-                elapsed += sleep_time
 
-        if session_data["stop_bot"]:
-            break
+            if wait_for(session_data, wait_seconds):
+                break
 
         if apply_delay(config, session_data, session_id):
             break
 
-        message = get_random_message(config)
+        message = get_random_message(config, session_data["rng"])
         send_message(
             config["token"],
             config["channel_id"],
@@ -347,15 +1078,74 @@ def run_random_window_mode(config, session_data, session_id):
     log("All messages sent for this window. Stopping bot.", session_id)
 
 
+def run_mode(config, session_data, session_id):
+    """Run the loop of the config's mode until it finishes or is stopped"""
+    if config["mode"] == "scheduled":
+        run_scheduled_mode(config, session_data, session_id)
+    elif config["mode"] == "spam":
+        run_spam_mode(config, session_data, session_id)
+    elif config["mode"] == "random_window":
+        run_random_window_mode(config, session_data, session_id)
+    else:
+        log(f"Unknown mode: {config['mode']}", session_id, "error")
+
+
+def simulate(config, horizon, start=None, seed=None):
+    """Fast-forward a config's mode over `horizon` seconds of virtual time
+
+    Runs the real mode functions in dry-run mode against a VirtualClock, so
+    a whole day of schedule takes milliseconds. Returns a dict with the
+    timeline of applied delays and sends (with the chosen messages), the
+    simulated console logs and whether the entry limit cut the run short.
+    A timezone-aware `start` is converted to local time, which is what the
+    modes run in. Raises ValueError if the config could not be started or
+    the simulated time would run past the end of the calendar.
+    """
+    config = Config.from_dict({**config, "dry_run": True}, get_default_config())
+    error_msg = get_config_error(config, require_credentials=False)
+    if error_msg:
+        raise ValueError(error_msg)
+
+    start = start or datetime.now()
+    if start.tzinfo is not None:
+        start = start.astimezone().replace(tzinfo=None)
+    # The modes look up to a day past the current time for the next window
+    if start > datetime.max - timedelta(seconds=horizon, days=2):
+        raise ValueError("Start is too late to simulate")
+
+    clock = VirtualClock(start, horizon)
+    session_data = create_simulation_data(clock, seed)
+    session_id = "simulation-" + str(uuid.uuid4())
+    with simulations_lock:
+        simulations[session_id] = session_data
+    try:
+        run_mode(config, session_data, session_id)
+    finally:
+        with simulations_lock:
+            del simulations[session_id]
+
+    timeline = session_data["timeline"]
+    return {
+        "start": clock.start.isoformat(),
+        "end": clock.now().isoformat(),
+        "timeline": timeline,
+        "sends": sum(1 for entry in timeline if entry["event"] == "send"),
+        "truncated": len(timeline) >= max_simulation_entries,
+        "logs": [format_record(r) for r in session_data["console_logs"].records()],
+    }
+
+
 def run_bot(session_id):
     """Main bot loop"""
     session_data = sessions_data[session_id]
     active_account = get_active_account(session_data)
     if not active_account:
-        log("Error: No active account found", session_id)
-        session_data["bot_running"] = False
+        log("Error: No active account found", session_id, "error")
+        with session_data["lock"]:
+            session_data["bot_running"] = False
+            publish_event(session_id, "status", {"bot_running": False})
         return
-    config = active_account["config"]
+    config = active_account.config
 
     log("=" * 50, session_id)
     log("Auto Message Bot Started", session_id)
@@ -384,50 +1174,149 @@ def run_bot(session_id):
     log("=" * 50, session_id)
 
     try:
-        if config["mode"] == "scheduled":
-            run_scheduled_mode(config, session_data, session_id)
-        elif config["mode"] == "spam":
-            run_spam_mode(config, session_data, session_id)
-        elif config["mode"] == "random_window":
-            run_random_window_mode(config, session_data, session_id)
-        else:
-            log(f"Unknown mode: {config['mode']}", session_id)
+        run_mode(config, session_data, session_id)
     finally:
-        session_data["bot_running"] = False
-        session_data["stop_bot"] = False
+        # Logged before the lock is taken, so the journal write is not
+        # made under it
         log("Bot stopped.", session_id)
+        with session_data["lock"]:
+            session_data["bot_running"] = False
+            session_data["stop_event"].clear()
+            publish_event(session_id, "status", {"bot_running": False})
+
+
+def get_config_error(config, require_credentials=True):
+    """Return why a config cannot be run, or None if it can"""
+    if require_credentials and (not config["token"] or not config["channel_id"]):
+        return "Token and Channel ID are required"
+
+    if not config["messages"]:
+        return "At least one message is required"
+
+    if config["mode"] == "scheduled":
+        if not config["send_times"]:
+            return "At least one send time is required for scheduled mode"
+        if not is_valid_schedule(config["send_times"]):
+            return "Send times must be valid HH:MM times"
+    elif config["mode"] == "spam" and config["spam_interval"] <= 0:
+        return "Spam interval must be greater than 0"
+    elif config["mode"] == "random_window":
+        if not config["window_start"] or not config["window_end"]:
+            return "Window start and end times are required"
+        if not is_valid_schedule([config["window_start"], config["window_end"]]):
+            return "Window start and end must be valid HH:MM times"
+        if not 0 < config["messages_count"] <= max_messages_count:
+            return f"Messages count must be between 1 and {max_messages_count}"
+
+    if config["delay_enabled"] and config["min_delay"] > config["max_delay"]:
+        return "Minimum delay cannot be greater than maximum delay"
+
+    return None
+
+
+def load_asset_manifest():
+    """Return the built bundles and the encodings available for each
+
+    Returns (manifest, encodings): manifest maps bundle names to file
+    names (None when the assets were not built) and encodings maps each
+    file name to the precompressed variants next to it, best first.
+    """
+    try:
+        with open(os.path.join(asset_dir, "manifest.json")) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None, {}
+
+    encodings = {}
+    for filename in manifest.values():
+        encodings[filename] = [
+            (encoding, suffix)
+            for encoding, suffix in (("br", ".br"), ("gzip", ".gz"))
+            if os.path.exists(os.path.join(asset_dir, filename + suffix))
+        ]
+    return manifest, encodings
+
+
+asset_manifest, asset_encodings = load_asset_manifest()
 
 
 @app.route("/")
 def index():
     """Serve the web interface"""
-    return render_template("index.html")
+    return render_template("index.html", assets=asset_manifest)
+
+
+@app.route("/assets/<filename>", methods=["GET"])
+def serve_asset(filename):
+    """Serve a built bundle, precompressed if the client accepts it
+
+    Bundle names contain a hash of their content, so clients may cache
+    them forever.
+    """
+    if filename not in asset_encodings:
+        return "Not found\n", 404
+
+    path = filename
+    content_encoding = None
+    for encoding, suffix in asset_encodings[filename]:
+        if request.accept_encodings[encoding]:
+            path = filename + suffix
+            content_encoding = encoding
+            break
+
+    response = send_from_directory(
+        asset_dir,
+        path,
+        mimetype=mimetypes.guess_type(filename)[0],
+        max_age=asset_max_age,
+    )
+    if content_encoding:
+        response.content_encoding = content_encoding
+    response.vary.add("Accept-Encoding")
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+@app.route("/metrics", methods=["GET"])
+def get_metrics():
+    """Expose metrics in the Prometheus text format"""
+    if not metrics_enabled:
+        return "Metrics are disabled\n", 404
+    return Response(metrics_registry.render(), mimetype="text/plain; version=0.0.4")
+
+
+def conditional_json(body, etag):
+    """Respond with a JSON body, or 304 Not Modified if the client has it
+
+    Clients must revalidate every time, so polling a resource that has
+    not changed costs neither encoding nor transfer.
+    """
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
 
 
 @app.route("/api/config", methods=["GET"])
 def get_config():
     """Get current configuration"""
     session_data = get_session_data()
-    active_account = get_active_account(session_data)
-    config = active_account["config"] if active_account else get_default_config()
-    return jsonify(
-        {
-            "token": config["token"],
-            "channel_id": config["channel_id"],
-            "messages": config["messages"],
-            "mode": config["mode"],
-            "delay_enabled": config["delay_enabled"],
-            "min_delay": config["min_delay"],
-            "max_delay": config["max_delay"],
-            "send_times": config["send_times"],
-            "spam_interval": config["spam_interval"],
-            "window_start": config["window_start"],
-            "window_end": config["window_end"],
-            "messages_count": config["messages_count"],
-            "dry_run": config.get("dry_run", False),
-            "bot_running": session_data["bot_running"],
-        }
-    )
+    with session_data["lock"]:
+        active_account = get_active_account(session_data)
+        if not active_account:
+            return jsonify({**get_default_config(), "bot_running": False})
+        bot_running = session_data["bot_running"]
+        etag = f"{active_account.config_etag()}-{int(bot_running)}"
+        if etag in request.if_none_match:
+            return conditional_json(None, etag)
+        config_json = active_account.config_json()
+
+    body = f'{config_json[:-1]},"bot_running":{json.dumps(bot_running)}}}'
+    return conditional_json(body, etag)
 
 
 @app.route("/api/config", methods=["POST"])
@@ -438,61 +1327,86 @@ def update_config():
     active_account = get_active_account(session_data)
     if not active_account:
         return jsonify({"success": False, "message": "No active account"}), 400
-    config = active_account["config"]
+    config = active_account.config
 
     try:
         data = request.json
     except Exception as e:
         error_msg = f"Invalid configuration data: {str(e)}"
-        log(f"Configuration Error: {error_msg}", session_id)
+        log(f"Configuration Error: {error_msg}", session_id, "error", "config")
         return jsonify({"success": False, "message": error_msg}), 400
 
     data = request.json
-    config["token"] = data.get("token", config["token"])
-    config["channel_id"] = data.get("channel_id", config["channel_id"])
-    config["messages"] = data.get("messages", config["messages"])
-    config["mode"] = data.get("mode", config["mode"])
-    config["delay_enabled"] = data.get("delay_enabled", config["delay_enabled"])
-
-    min_delay_val = data.get("min_delay", config["min_delay"])
-    config["min_delay"] = (
-        int(min_delay_val) if min_delay_val != "" and min_delay_val is not None else 0
-    )
-    max_delay_val = data.get("max_delay", config["max_delay"])
-    config["max_delay"] = (
-        int(max_delay_val) if max_delay_val != "" and max_delay_val is not None else 0
-    )
 
-    if config["delay_enabled"] and config["min_delay"] > config["max_delay"]:
-        error_msg = "Minimum delay cannot be greater than maximum delay"
-        log(f"Configuration Warning: {error_msg}", session_id)
-        config["min_delay"], config["max_delay"] = (
-            config["max_delay"],
-            config["min_delay"],
+    # Validate and compile the schedule before changing anything
+    try:
+        send_times = [
+            format_time_of_day(minutes)
+            for minutes in compile_schedule(data.get("send_times", config.send_times))
+        ]
+        window_start = data.get("window_start", config.window_start)
+        window_end = data.get("window_end", config.window_end)
+        if window_start and window_end:
+            compile_window(window_start, window_end)
+    except (TypeError, ValueError) as e:
+        error_msg = f"Invalid schedule: {str(e)}"
+        log(f"Configuration Error: {error_msg}", session_id, "error", "config")
+        return jsonify({"success": False, "message": error_msg}), 400
+
+    with session_data["lock"]:
+        # Drop cached encodings first, in case a field below fails to convert
+        session_data["accounts"].changed(active_account)
+
+        config.token = data.get("token", config.token)
+        config.channel_id = data.get("channel_id", config.channel_id)
+        config.messages = data.get("messages", config.messages)
+        config.mode = data.get("mode", config.mode)
+        config.delay_enabled = data.get("delay_enabled", config.delay_enabled)
+
+        min_delay_val = data.get("min_delay", config.min_delay)
+        config.min_delay = (
+            int(min_delay_val)
+            if min_delay_val != "" and min_delay_val is not None
+            else 0
+        )
+        max_delay_val = data.get("max_delay", config.max_delay)
+        config.max_delay = (
+            int(max_delay_val)
+            if max_delay_val != "" and max_delay_val is not None
+            else 0
         )
 
-    config["send_times"] = data.get("send_times", config["send_times"])
+        # Warned about below, once the lock is released
+        delays_swapped = config.delay_enabled and config.min_delay > config.max_delay
+        if delays_swapped:
+            config.min_delay, config.max_delay = config.max_delay, config.min_delay
 
-    spam_interval_val = data.get("spam_interval", config["spam_interval"])
-    config["spam_interval"] = (
-        int(spam_interval_val)
-        if spam_interval_val != "" and spam_interval_val is not None
-        else 60
-    )
+        config.send_times = send_times
+
+        spam_interval_val = data.get("spam_interval", config.spam_interval)
+        config.spam_interval = (
+            int(spam_interval_val)
+            if spam_interval_val != "" and spam_interval_val is not None
+            else 60
+        )
 
-    config["window_start"] = data.get("window_start", config["window_start"])
-    config["window_end"] = data.get("window_end", config["window_end"])
+        config.window_start = window_start
+        config.window_end = window_end
 
-    messages_count_val = data.get("messages_count", config["messages_count"])
-    config["messages_count"] = (
-        int(messages_count_val)
-        if messages_count_val != "" and messages_count_val is not None
-        else 10
-    )
+        messages_count_val = data.get("messages_count", config.messages_count)
+        config.messages_count = (
+            int(messages_count_val)
+            if messages_count_val != "" and messages_count_val is not None
+            else 10
+        )
 
-    config["dry_run"] = data.get("dry_run", config.get("dry_run", False))
+        config.dry_run = data.get("dry_run", config.dry_run)
 
-    log("Configuration updated successfully", session_id)
+    if delays_swapped:
+        error_msg = "Minimum delay cannot be greater than maximum delay"
+        log(f"Configuration Warning: {error_msg}", session_id, "warning", "config")
+    persist_session(session_id, session_data)
+    log("Configuration updated successfully", session_id, kind="config")
     return jsonify({"success": True, "message": "Configuration updated"})
 
 
@@ -504,52 +1418,65 @@ def start_bot():
     active_account = get_active_account(session_data)
     if not active_account:
         return jsonify({"success": False, "message": "No active account"}), 400
-    config = active_account["config"]
-
-    if session_data["bot_running"]:
-        return jsonify({"success": False, "message": "Bot is already running"})
+    config = active_account.config
+
+    # Check and transition under the session lock so that concurrent
+    # start requests cannot both launch a bot thread
+    with session_data["lock"]:
+        if shutting_down.is_set():
+            message = "Server is shutting down"
+            return jsonify({"success": False, "message": message}), 503
+        if session_data["bot_running"]:
+            return jsonify({"success": False, "message": "Bot is already running"})
+
+        error_msg = get_config_error(config)
+        if not error_msg:
+            session_data["stop_event"].clear()
+            session_data["bot_running"] = True
+            session_data["bot_thread"] = threading.Thread(
+                target=run_bot, args=(session_id,), daemon=True
+            )
+            session_data["bot_thread"].start()
+            publish_event(session_id, "status", {"bot_running": True})
 
-    if not config["token"] or not config["channel_id"]:
-        error_msg = "Token and Channel ID are required"
-        log(f"Configuration Error: {error_msg}", session_id)
+    if error_msg:
+        log(f"Configuration Error: {error_msg}", session_id, "error", "config")
         return jsonify({"success": False, "message": error_msg})
+    return jsonify({"success": True, "message": "Bot started"})
 
-    if not config["messages"]:
-        error_msg = "At least one message is required"
-        log(f"Configuration Error: {error_msg}", session_id)
-        return jsonify({"success": False, "message": error_msg})
 
-    if config["mode"] == "scheduled" and not config["send_times"]:
-        error_msg = "At least one send time is required for scheduled mode"
-        log(f"Configuration Error: {error_msg}", session_id)
-        return jsonify(
-            {
-                "success": False,
-                "message": error_msg,
-            }
-        )
-    elif config["mode"] == "spam" and config["spam_interval"] <= 0:
-        error_msg = "Spam interval must be greater than 0"
-        log(f"Configuration Error: {error_msg}", session_id)
-        return jsonify({"success": False, "message": error_msg})
-    elif config["mode"] == "random_window":
-        if not config["window_start"] or not config["window_end"]:
-            error_msg = "Window start and end times are required"
-            log(f"Configuration Error: {error_msg}", session_id)
-            return jsonify({"success": False, "message": error_msg})
-        if config["messages_count"] <= 0:
-            error_msg = "Messages count must be greater than 0"
-            log(f"Configuration Error: {error_msg}", session_id)
-            return jsonify({"success": False, "message": error_msg})
-
-    session_data["stop_bot"] = False
-    session_data["bot_running"] = True
-    session_data["bot_thread"] = threading.Thread(
-        target=run_bot, args=(session_id,), daemon=True
-    )
-    session_data["bot_thread"].start()
+@app.route("/api/simulate", methods=["POST"])
+def simulate_config():
+    """Simulate the active config over a time horizon without sending anything"""
+    session_data = get_session_data()
+    data = request.get_json(silent=True) or {}
 
-    return jsonify({"success": True, "message": "Bot started"})
+    try:
+        horizon_hours = float(data.get("horizon_hours", 24))
+        start = datetime.fromisoformat(data["start"]) if data.get("start") else None
+        seed = data.get("seed")
+        if seed is not None and not isinstance(seed, (int, str)):
+            raise ValueError("seed must be an integer or a string")
+    except (TypeError, ValueError) as e:
+        return jsonify({"success": False, "message": f"Invalid parameters: {e}"}), 400
+    if not 0 < horizon_hours <= max_simulation_hours:
+        error_msg = f"Horizon must be between 0 and {max_simulation_hours} hours"
+        return jsonify({"success": False, "message": error_msg}), 400
+
+    with session_data["lock"]:
+        active_account = get_active_account(session_data)
+        if not active_account:
+            return jsonify({"success": False, "message": "No active account"}), 400
+        config = active_account.config.to_dict()
+
+    started = time.perf_counter()
+    try:
+        result = simulate(config, horizon_hours * 3600, start, seed)
+    except (OverflowError, ValueError) as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+    return jsonify({"success": True, **result})
 
 
 @app.route("/api/stop", methods=["POST"])
@@ -557,45 +1484,249 @@ def stop_bot_endpoint():
     """Stop the bot"""
     session_data = get_session_data()
 
-    if not session_data["bot_running"]:
-        return jsonify({"success": False, "message": "Bot is not running"})
+    with session_data["lock"]:
+        if not session_data["bot_running"]:
+            return jsonify({"success": False, "message": "Bot is not running"})
 
-    session_data["stop_bot"] = True
+        session_data["stop_event"].set()
     return jsonify({"success": True, "message": "Bot stopping..."})
 
 
 @app.route("/api/logs", methods=["GET"])
 def get_logs():
-    """Get console logs"""
+    """Get console logs
+
+    Query arguments: `after` returns only entries after that sequence
+    number, `level` sets a minimum level, `kind` keeps a comma-separated
+    list of kinds and `q` keeps messages containing the text.
+    """
     session_data = get_session_data()
-    return jsonify({"logs": session_data["console_logs"]})
+    try:
+        predicate = make_log_filter(
+            request.args.get("level"), request.args.get("kind"), request.args.get("q")
+        )
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    console_logs = session_data["console_logs"]
+    after = parse_seq(request.args.get("after"))
+    with session_data["lock"]:
+        entries, gap = console_logs.since(after, predicate)
+        last_seq = console_logs.last_seq
+    return jsonify(
+        {
+            "entries": [serialize_record(seq, record) for seq, record in entries],
+            "last_seq": last_seq,
+            "gap": gap,
+        }
+    )
+
+
+@app.route("/api/logs/history", methods=["GET"])
+def get_log_history():
+    """Get console history from the on-disk journal
+
+    By default returns the last `tail` entries (max_logs unless given).
+    With `since` and/or `until` (Unix timestamps or ISO datetimes) it
+    returns the first `limit` entries (max_logs unless given) in that time
+    range instead. Both are capped at max_log_history. format=text streams
+    the selected history as plain text lines, without a default limit.
+    """
+    if not log_journal:
+        return jsonify({"success": False, "message": "Log history is disabled"}), 404
+    get_session_data()
+    session_id = session["session_id"]
+
+    try:
+        since = parse_timestamp(request.args.get("since"))
+        until = parse_timestamp(request.args.get("until"))
+        tail = int(request.args.get("tail", max_logs))
+        limit = request.args.get("limit")
+        limit = int(limit) if limit else None
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    text = request.args.get("format") == "text"
+    if not text:
+        tail = min(tail, max_log_history)
+        limit = min(max_logs if limit is None else limit, max_log_history)
+
+    if since is None and until is None and not text:
+        rows = log_journal.tail(session_id, max(0, tail))
+    else:
+        rows = log_journal.read(session_id, since, until, limit)
+    entries = (
+        (seq, LogRecord(timestamp, level, kind, session_id, message))
+        for seq, timestamp, level, kind, message in rows
+    )
+
+    if text:
+        lines = (format_record(record) + "\n" for _, record in entries)
+        return Response(lines, mimetype="text/plain")
+    return jsonify(
+        {"entries": [serialize_record(seq, record) for seq, record in entries]}
+    )
+
+
+def limit_event_streams(count):
+    """Allow at most `count` open event streams
+
+    A server with a fixed pool of worker threads should call this with
+    fewer streams than it has threads, so that some are always left for
+    the other requests. Streams beyond the limit get a 503, on which the
+    dashboard falls back to polling.
+    """
+    global event_stream_slots
+    event_stream_slots = threading.BoundedSemaphore(count)
+
+
+@app.route("/api/events", methods=["GET"])
+def stream_events():
+    """Stream log lines, status transitions and stats deltas as Server-Sent Events"""
+    slots = event_stream_slots
+    if slots and not slots.acquire(blocking=False):
+        error_msg = "Too many open event streams"
+        return jsonify({"success": False, "message": error_msg}), 503
+
+    session_data = get_session_data()
+    subscriber = queue.Queue(maxsize=event_queue_size)
+    with session_data["lock"]:
+        session_data["subscribers"].append(subscriber)
+
+    # EventSource resends the last id it saw when it reconnects
+    last_event_id = parse_seq(request.headers.get("Last-Event-ID"))
+
+    def snapshot(after):
+        """Return (messages, last_seq) bringing a client at `after` up to date"""
+        console_logs = session_data["console_logs"]
+        with session_data["lock"]:
+            last_seq = console_logs.last_seq
+            entries, gap = console_logs.since(after)
+        if after and not gap:
+            messages = [
+                format_sse("log", serialize_record(seq, record), seq)
+                for seq, record in entries
+            ]
+        else:
+            data = {
+                "entries": [serialize_record(seq, record) for seq, record in entries],
+                "last_seq": last_seq,
+            }
+            messages = [format_sse("logs", data, last_seq)]
+        return messages, last_seq
+
+    def generate():
+        try:
+            # Initial state, so the client never needs a separate fetch
+            yield format_sse("status", {"bot_running": session_data["bot_running"]})
+            messages, sent_seq = snapshot(last_event_id)
+            yield from messages
+            while True:
+                try:
+                    event, data = subscriber.get(timeout=event_keepalive_interval)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+
+                if event == "shutdown":
+                    return
+                if event == "resync":
+                    messages, sent_seq = snapshot(0)
+                    yield from messages
+                    yield format_sse(
+                        "status", {"bot_running": session_data["bot_running"]}
+                    )
+                elif event == "log":
+                    # Lines already covered by a snapshot are queued too
+                    if data["seq"] > sent_seq:
+                        sent_seq = data["seq"]
+                        yield format_sse(event, data, data["seq"])
+                else:
+                    yield format_sse(event, data)
+        finally:
+            with session_data["lock"]:
+                if subscriber in session_data["subscribers"]:
+                    session_data["subscribers"].remove(subscriber)
+
+    response = Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    if slots:
+        # Runs when the server closes the response, even if the client
+        # went away before the stream was ever read
+        response.call_on_close(slots.release)
+    return response
+
+
+@app.route("/api/sessions", methods=["GET"])
+def get_sessions_usage():
+    """Get session count and estimated memory usage for monitoring"""
+    now = time.monotonic()
+    usage = []
+    for session_id, session_data in sessions_data.items():
+        with session_data["lock"]:
+            size = estimate_session_bytes(session_data)
+        usage.append(
+            {
+                "id": session_id[:8],
+                "bytes": size,
+                "idle_seconds": round(now - session_data["last_seen"], 1),
+                "bot_running": session_data["bot_running"],
+            }
+        )
+    usage.sort(key=lambda entry: entry["bytes"], reverse=True)
+    return jsonify(
+        {
+            "count": len(usage),
+            "max_sessions": sessions_data.max_size,
+            "idle_ttl": sessions_data.idle_ttl,
+            "total_bytes": sum(entry["bytes"] for entry in usage),
+            "sessions": usage,
+        }
+    )
 
 
 @app.route("/api/message-stats", methods=["GET"])
 def get_message_stats():
-    """Get message statistics"""
+    """Get message statistics
+
+    With `since` (and the `epoch` it came with) only the messages and time
+    buckets that changed after that version are returned.
+    """
     session_data = get_session_data()
-    return jsonify({"stats": session_data["message_stats"]})
+    since = parse_seq(request.args.get("since"))
+    with session_data["lock"]:
+        return jsonify(
+            session_data["message_stats"].delta(
+                since, session_data["clock"].time(), request.args.get("epoch")
+            )
+        )
 
 
 @app.route("/api/message-stats", methods=["DELETE"])
 def reset_message_stats():
     """Reset message statistics"""
     session_data = get_session_data()
-    session_data["message_stats"] = {}
-    return jsonify({"success": True})
+    with session_data["lock"]:
+        message_stats = session_data["message_stats"]
+        message_stats.reset()
+        publish_event(
+            session["session_id"], "stats_reset", {"version": message_stats.version}
+        )
+    return jsonify({"success": True, "version": message_stats.version})
 
 
 @app.route("/api/accounts", methods=["GET"])
 def get_accounts():
     """Get all accounts"""
     session_data = get_session_data()
-    return jsonify(
-        {
-            "accounts": session_data["accounts"],
-            "active_account_id": session_data["active_account_id"],
-        }
-    )
+    with session_data["lock"]:
+        accounts = session_data["accounts"]
+        etag = accounts.etag()
+        body = None if etag in request.if_none_match else accounts.to_json()
+    return conditional_json(body, etag)
 
 
 @app.route("/api/accounts", methods=["POST"])
@@ -604,23 +1735,17 @@ def create_account():
     session_data = get_session_data()
     data = request.json
 
-    # If config is provided (from import), use it; otherwise use default
-    config = data.get("config", get_default_config())
-
-    # Ensure all required fields exist in imported config
-    default_config = get_default_config()
-    for key in default_config:
-        if key not in config:
-            config[key] = default_config[key]
-
-    new_account = {
-        "id": str(uuid.uuid4()),
-        "name": data.get("name", f"Account {len(session_data['accounts']) + 1}"),
-        "config": config,
-    }
+    # If config is provided (from import), use it; missing fields get defaults
+    config = Config.from_dict(data.get("config") or {}, get_default_config())
 
-    session_data["accounts"].append(new_account)
-    return jsonify({"success": True, "account": new_account})
+    with session_data["lock"]:
+        accounts = session_data["accounts"]
+        new_account = Account(
+            str(uuid.uuid4()), data.get("name", f"Account {len(accounts) + 1}"), config
+        )
+        accounts.add(new_account)
+    persist_session(session["session_id"], session_data)
+    return jsonify({"success": True, "account": new_account.to_dict()})
 
 
 @app.route("/api/accounts/<account_id>", methods=["PUT"])
@@ -629,10 +1754,13 @@ def update_account(account_id):
     session_data = get_session_data()
     data = request.json
 
-    for account in session_data["accounts"]:
-        if account["id"] == account_id:
-            account["name"] = data.get("name", account["name"])
-            return jsonify({"success": True, "account": account})
+    with session_data["lock"]:
+        account = session_data["accounts"].get(account_id)
+        if account:
+            account.name = data.get("name", account.name)
+            session_data["accounts"].changed(account)
+            persist_session(session["session_id"], session_data)
+            return jsonify({"success": True, "account": account.to_dict()})
 
     return jsonify({"success": False, "message": "Account not found"}), 404
 
@@ -642,19 +1770,17 @@ def delete_account(account_id):
     """Delete an account"""
     session_data = get_session_data()
 
-    if len(session_data["accounts"]) <= 1:
-        return (
-            jsonify({"success": False, "message": "Cannot delete the last account"}),
-            400,
-        )
+    with session_data["lock"]:
+        if len(session_data["accounts"]) <= 1:
+            return (
+                jsonify(
+                    {"success": False, "message": "Cannot delete the last account"}
+                ),
+                400,
+            )
 
-    for i, account in enumerate(session_data["accounts"]):
-        if account["id"] == account_id:
-            if session_data["active_account_id"] == account_id:
-                session_data["active_account_id"] = session_data["accounts"][
-                    0 if i == 0 else i - 1
-                ]["id"]
-            session_data["accounts"].pop(i)
+        if session_data["accounts"].remove(account_id):
+            persist_session(session["session_id"], session_data)
             return jsonify({"success": True})
 
     return jsonify({"success": False, "message": "Account not found"}), 404
@@ -665,23 +1791,32 @@ def activate_account(account_id):
     """Set active account"""
     session_data = get_session_data()
 
-    if session_data["bot_running"]:
-        return (
-            jsonify(
-                {"success": False, "message": "Stop the bot before switching accounts"}
-            ),
-            400,
-        )
+    with session_data["lock"]:
+        if session_data["bot_running"]:
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "message": "Stop the bot before switching accounts",
+                    }
+                ),
+                400,
+            )
 
-    for account in session_data["accounts"]:
-        if account["id"] == account_id:
-            session_data["active_account_id"] = account_id
-            return jsonify({"success": True, "account": account})
+        account = session_data["accounts"].activate(account_id)
+        if account:
+            persist_session(session["session_id"], session_data)
+            return jsonify({"success": True, "account": account.to_dict()})
 
     return jsonify({"success": False, "message": "Account not found"}), 404
 
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="[%(asctime)s] %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
     print("Starting Discord Auto Message Bot Web Interface...")
     print("Open your browser to: http://localhost:5000")
     app.run(debug=False, host="0.0.0.0", port=5000)
@@ -0,0 +1,389 @@
+"""Concurrent-client load test for the Flask API
+
+Simulates N dashboard tabs, each with its own session cookie, replaying
+the frontend's traffic: an /api/events stream held open for live
+updates, auto-save POSTs and occasional config switches, with every bot
+started in dry-run mode. A tab whose stream is refused falls back to
+polling status and logs every 2 s, as the dashboard does; --poll makes
+every tab poll instead. Concurrency is stepped through --levels and each level reports
+p50/p99 latency, throughput, server RSS and any 4xx responses per route.
+
+By default the app runs in this process behind Flask's test client; pass
+--url to load a running server instead (and --pid to sample its RSS).
+
+    python benchmarks/loadtest.py --levels 1,10,50 --duration 20
+    python benchmarks/loadtest.py --url http://localhost:5000 --pid 12345
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+
+class InProcessClient:
+    """Cookie-isolated client calling the app through Flask's test client"""
+
+    def __init__(self, app):
+        self._client = app.test_client()
+
+    def request(self, method, path, payload=None):
+        response = self._client.open(path, method=method, json=payload)
+        return response.status_code, response.get_json(silent=True)
+
+    def stream(self, path):
+        """Open a streaming response; return (status, chunks, close)"""
+        response = self._client.get(path, buffered=False)
+        return response.status_code, iter(response.response), response.close
+
+
+class HttpClient:
+    """Cookie-isolated client calling a running server over HTTP"""
+
+    def __init__(self, base_url):
+        import requests
+
+        self._session = requests.Session()
+        self._base_url = base_url.rstrip("/")
+
+    def request(self, method, path, payload=None):
+        response = self._session.request(
+            method, self._base_url + path, json=payload, timeout=30
+        )
+        try:
+            return response.status_code, response.json()
+        except ValueError:
+            return response.status_code, None
+
+    def stream(self, path):
+        """Open a streaming response; return (status, chunks, close)"""
+        response = self._session.get(self._base_url + path, stream=True, timeout=30)
+        return response.status_code, response.iter_content(None), response.close
+
+
+def route_of(method, path):
+    """Group a request under its route, with account ids replaced by <id>"""
+    path = path.split("?")[0]
+    path = re.sub(r"/api/accounts/[^/]+", "/api/accounts/<id>", path)
+    return f"{method} {path}"
+
+
+class Recorder:
+    """Collects request latencies and failures from every tab thread
+
+    Server errors and failed requests count as errors; 4xx responses are
+    counted per route, since the replayed traffic should never get one.
+    """
+
+    def __init__(self):
+        self.samples = []
+        self.errors = 0
+        self.client_errors = {}
+        self.streams = 0
+        self.events = 0
+        self._lock = threading.Lock()
+
+    def call(self, client, method, path, payload=None):
+        start = time.perf_counter()
+        try:
+            status, data = client.request(method, path, payload)
+        except Exception:
+            status, data = None, None
+        self._record(route_of(method, path), time.perf_counter() - start, status)
+        return data or {}
+
+    def open_stream(self, client, path):
+        """Open an event stream, timing the response headers
+
+        Returns (chunks, close), or None if the stream was refused.
+        """
+        start = time.perf_counter()
+        try:
+            status, chunks, close = client.stream(path)
+        except Exception:
+            status = None
+        self._record(route_of("GET", path), time.perf_counter() - start, status)
+        if status != 200:
+            if status is not None:
+                close()
+            return None
+        with self._lock:
+            self.streams += 1
+        return chunks, close
+
+    def read_stream(self, chunks, close, stop):
+        """Count the events on an open stream until `stop` is set"""
+        try:
+            for chunk in chunks:
+                with self._lock:
+                    self.events += chunk.count(b"data:")
+                if stop.is_set():
+                    break
+        except Exception:
+            pass
+        finally:
+            close()
+
+    def _record(self, route, latency, status):
+        with self._lock:
+            self.samples.append((route, latency))
+            if status is None or status >= 500:
+                self.errors += 1
+            elif status >= 400:
+                self.client_errors[route] = self.client_errors.get(route, 0) + 1
+
+
+def tab_config(rng):
+    """A dry-run config like the one the dashboard auto-saves"""
+    return {
+        "token": "load-test-token",
+        "channel_id": "123456789012345678",
+        "messages": [f"Load test message {index}" for index in range(5)],
+        "mode": "spam",
+        "delay_enabled": False,
+        "min_delay": 0,
+        "max_delay": 0,
+        "send_times": [],
+        "spam_interval": rng.randint(2, 10),
+        "window_start": "09:00",
+        "window_end": "17:00",
+        "messages_count": 10,
+        "dry_run": True,
+    }
+
+
+def wait_until_stopped(client, recorder, timeout=5):
+    """Poll the config like the dashboard does until the bot has stopped"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        config = recorder.call(client, "GET", "/api/config")
+        if not config.get("bot_running"):
+            return
+        time.sleep(0.05)
+
+
+def run_tab(client, recorder, rng, poll_interval, stop_at, poll=False):
+    """Replay one dashboard tab's traffic until stop_at"""
+    call = recorder.call
+    config = tab_config(rng)
+
+    # Page load: accounts, config, then a second config to switch to
+    accounts = call(client, "GET", "/api/accounts").get("accounts", [])
+    call(client, "GET", "/api/config")
+    created = call(client, "POST", "/api/accounts", {"name": "Load test 2"})
+    account_ids = [account["id"] for account in accounts]
+    if created.get("account"):
+        account_ids.append(created["account"]["id"])
+    call(client, "POST", "/api/config", config)
+    call(client, "POST", "/api/start")
+
+    stream = None if poll else recorder.open_stream(client, "/api/events")
+    stop_reading = threading.Event()
+    reader = None
+    if stream:
+        reader = threading.Thread(
+            target=recorder.read_stream, args=(*stream, stop_reading), daemon=True
+        )
+        reader.start()
+    # Like the dashboard, poll only without a live stream
+    polling = stream is None
+
+    now = time.monotonic()
+    next_poll = now + rng.uniform(0, poll_interval)
+    next_save = now + rng.uniform(5, 15)
+    next_switch = now + rng.uniform(20, 40)
+    active = 0
+    last_seq = 0
+
+    while True:
+        wake_at = min(next_poll, next_save, next_switch)
+        if wake_at >= stop_at:
+            break
+        time.sleep(max(0, wake_at - time.monotonic()))
+
+        if wake_at == next_poll:
+            if polling:
+                call(client, "GET", "/api/config")
+                logs = call(client, "GET", f"/api/logs?after={last_seq}")
+                last_seq = logs.get("last_seq", last_seq)
+            next_poll += poll_interval
+        elif wake_at == next_save:
+            config["messages"].append(f"Edited message {rng.random():.6f}")
+            config["messages"] = config["messages"][-10:]
+            call(client, "POST", "/api/config", config)
+            next_save += rng.uniform(5, 15)
+        else:
+            active = (active + 1) % len(account_ids)
+            call(client, "POST", "/api/stop")
+            # Stopping only signals the bot; switching is refused until it exits
+            wait_until_stopped(client, recorder)
+            call(client, "POST", f"/api/accounts/{account_ids[active]}/activate")
+            call(client, "GET", "/api/config")
+            call(client, "POST", "/api/config", config)
+            call(client, "POST", "/api/start")
+            next_switch += rng.uniform(20, 40)
+
+    stop_reading.set()
+    # Stopping the bot sends "Bot stopped." down the stream, which wakes
+    # the reader so it can notice it should close
+    call(client, "POST", "/api/stop")
+    if reader:
+        reader.join(20)
+
+
+def rss_bytes(pid=None):
+    """Current resident set size of a process (this one by default)"""
+    try:
+        with open(f"/proc/{pid or 'self'}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if pid:
+        return None
+    # Peak rather than current RSS, but available without /proc
+    import resource
+
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def run_level(make_client, tabs, duration, poll_interval, seed, pid, poll=False):
+    recorder = Recorder()
+    stop_at = time.monotonic() + duration
+    threads = []
+    for index in range(tabs):
+        rng = random.Random(seed + index)
+        threads.append(
+            threading.Thread(
+                target=run_tab,
+                args=(make_client(), recorder, rng, poll_interval, stop_at, poll),
+            )
+        )
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for _, latency in recorder.samples]
+    by_route = {}
+    for route, latency in recorder.samples:
+        by_route.setdefault(route, []).append(latency)
+
+    rss = rss_bytes(pid)
+    return {
+        "tabs": tabs,
+        "requests": len(latencies),
+        "errors": recorder.errors,
+        "client_errors": sum(recorder.client_errors.values()),
+        "streams": recorder.streams,
+        "stream_events": recorder.events,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 3),
+        "rss_mb": round(rss / 2**20, 1) if rss else None,
+        "routes": {
+            route: {
+                "requests": len(values),
+                "p50_ms": round(percentile(values, 0.5) * 1000, 3),
+                "p99_ms": round(percentile(values, 0.99) * 1000, 3),
+                "client_errors": recorder.client_errors.get(route, 0),
+            }
+            for route, values in sorted(by_route.items())
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--levels",
+        default="1,5,10,25,50",
+        help="comma-separated numbers of concurrent tabs (default: 1,5,10,25,50)",
+    )
+    parser.add_argument(
+        "--duration", type=float, default=30, help="seconds per level (default: 30)"
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=2.0,
+        help="status/log polling period in seconds, for tabs that poll "
+        "(default: 2, like the frontend)",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="poll status and logs instead of holding an event stream per tab",
+    )
+    parser.add_argument("--url", help="load a running server instead of the app")
+    parser.add_argument("--pid", type=int, help="server process to sample RSS from")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON results to this file")
+    args = parser.parse_args()
+
+    try:
+        levels = [int(level) for level in args.levels.split(",")]
+    except ValueError:
+        parser.error("--levels must be a comma-separated list of integers")
+
+    if args.url:
+        make_client = lambda: HttpClient(args.url)  # noqa: E731
+        pid = args.pid
+    else:
+        import auto_message
+
+        make_client = lambda: InProcessClient(auto_message.app)  # noqa: E731
+        pid = None
+
+    results = []
+    for tabs in levels:
+        result = run_level(
+            make_client,
+            tabs,
+            args.duration,
+            args.poll_interval,
+            args.seed,
+            pid,
+            args.poll,
+        )
+        results.append(result)
+        print(
+            f"{tabs:>5} tabs  {result['throughput_rps']:>8} req/s  "
+            f"p50 {result['p50_ms']:>8} ms  p99 {result['p99_ms']:>8} ms  "
+            f"rss {result['rss_mb']} MB  errors {result['errors']}  "
+            f"4xx {result['client_errors']}  streams {result['streams']}/{tabs}",
+            file=sys.stderr,
+        )
+
+    report = {
+        "target": args.url or "in-process",
+        "duration": args.duration,
+        "poll_interval": args.poll_interval,
+        "levels": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""Micro-benchmarks for the bot core and API handlers
+
+Runs offline: every config is a dry run and nothing is sent to Discord.
+Results are printed as JSON (or written with --output), and --compare
+exits with status 1 when a benchmark got slower than a previous run by
+more than --threshold.
+
+    python benchmarks/run.py --output baseline.json
+    python benchmarks/run.py --compare baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import auto_message  # noqa: E402
+
+
+def measure(func, number, repeat):
+    """Time `number` calls of func, `repeat` times; return per-call seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return timings
+
+
+def new_client():
+    """Return a test client with a fresh session, its id and its data"""
+    client = auto_message.app.test_client()
+    client.get("/api/config")
+    with client.session_transaction() as session:
+        session_id = session["session_id"]
+    return client, session_id, auto_message.sessions_data[session_id]
+
+
+def bench_log_append():
+    _, session_id, _ = new_client()
+    counter = iter(range(10**9))
+    return lambda: auto_message.log(f"Benchmark line {next(counter)}", session_id)
+
+
+def bench_next_send_time():
+    send_times = [f"{minute // 60:02d}:{minute % 60:02d}" for minute in range(1440)]
+    config = auto_message.Config.from_dict(
+        {"send_times": send_times}, auto_message.get_default_config()
+    )
+    now = datetime(2026, 1, 1, 12, 0, 30)
+    return lambda: auto_message.get_next_send_time(config, now)
+
+
+def bench_active_account():
+    _, _, session_data = new_client()
+    accounts = [
+        {
+            "id": f"account-{index}",
+            "name": f"Config {index}",
+            "config": auto_message.get_default_config(),
+        }
+        for index in range(1000)
+    ]
+    session_data["accounts"] = auto_message.Accounts.from_dicts(
+        accounts, accounts[-1]["id"], auto_message.get_default_config()
+    )
+    return lambda: auto_message.get_active_account(session_data)
+
+
+def bench_get_logs():
+    client, session_id, _ = new_client()
+    for index in range(auto_message.max_logs):
+        auto_message.log(f"Benchmark line {index}", session_id)
+    return lambda: client.get("/api/logs")
+
+
+def bench_get_logs_incremental():
+    client, session_id, session_data = new_client()
+    for index in range(auto_message.max_logs):
+        auto_message.log(f"Benchmark line {index}", session_id)
+    after = session_data["console_logs"].last_seq - 1
+    return lambda: client.get(f"/api/logs?after={after}")
+
+
+def bench_get_config():
+    client, _, _ = new_client()
+    client.post(
+        "/api/config",
+        json={"messages": [f"Message {index}" for index in range(50)], "dry_run": True},
+    )
+    return lambda: client.get("/api/config")
+
+
+def bench_update_config():
+    client, _, _ = new_client()
+    payload = {
+        "token": "benchmark-token",
+        "channel_id": "123456789012345678",
+        "messages": [f"Message {index}" for index in range(50)],
+        "mode": "scheduled",
+        "delay_enabled": True,
+        "min_delay": 5,
+        "max_delay": 30,
+        "send_times": [f"{hour:02d}:30" for hour in range(24)],
+        "spam_interval": 60,
+        "window_start": "09:00",
+        "window_end": "17:00",
+        "messages_count": 10,
+        "dry_run": True,
+    }
+    return lambda: client.post("/api/config", json=payload)
+
+
+# name -> (setup returning the function to time, calls per repeat)
+BENCHMARKS = {
+    "log_append": (bench_log_append, 5000),
+    "get_next_send_time_1440": (bench_next_send_time, 5000),
+    "get_active_account_1000": (bench_active_account, 2000),
+    "get_logs_full": (bench_get_logs, 200),
+    "get_logs_incremental": (bench_get_logs_incremental, 500),
+    "get_config": (bench_get_config, 500),
+    "update_config": (bench_update_config, 200),
+}
+
+
+def run(names, repeat):
+    results = {}
+    for name in names:
+        setup, number = BENCHMARKS[name]
+        func = setup()
+        func()  # warm up caches
+        timings = measure(func, number, repeat)
+        best = min(timings)
+        results[name] = {
+            "calls": number,
+            "repeat": repeat,
+            "best_us": round(best * 1e6, 3),
+            "median_us": round(statistics.median(timings) * 1e6, 3),
+            "ops_per_sec": round(1 / best, 1),
+        }
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return the benchmarks whose best time regressed beyond threshold"""
+    regressions = {}
+    for name, result in results.items():
+        previous = baseline["benchmarks"].get(name)
+        if not previous:
+            continue
+        ratio = result["best_us"] / previous["best_us"]
+        if ratio > 1 + threshold:
+            regressions[name] = round(ratio, 3)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help="benchmarks to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--compare", help="previous results to check against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="allowed slowdown before --compare fails (default: 0.2 = 20%%)",
+    )
+    args = parser.parse_args()
+
+    names = args.names or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    results = run(names, args.repeat)
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "benchmarks": results,
+    }
+
+    exit_code = 0
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        report["regressions"] = regressions
+        exit_code = 1 if regressions else 0
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
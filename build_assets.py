@@ -0,0 +1,313 @@
+"""Bundle the dashboard's CSS and JS for production
+
+Concatenates the stylesheets and scripts in the order index.html loads
+them, minifies them, and writes content-hashed bundles to static/dist
+with gzip (and, if the brotli package is installed, brotli) variants
+next to them. static/dist/manifest.json maps each bundle to its current
+file name; the server serves the bundles whenever the manifest exists.
+
+    python build_assets.py
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(ROOT, "static")
+DIST_DIR = os.path.join(STATIC_DIR, "dist")
+
+# Keep in sync with the individual tags in templates/index.html
+BUNDLES = {
+    "app.css": [
+        "css/variables.css",
+        "css/animations.css",
+        "css/layout.css",
+        "css/forms.css",
+        "css/buttons.css",
+        "css/chips.css",
+        "css/modes.css",
+        "css/console.css",
+        "css/modal.css",
+        "css/configs.css",
+        "css/stats.css",
+        "css/toast.css",
+        "css/responsive.css",
+    ],
+    "app.js": [
+        "js/state.js",
+        "js/stats.js",
+        "js/toast.js",
+        "js/configs.js",
+        "js/api.js",
+        "js/ui.js",
+        "js/bot.js",
+        "js/main.js",
+    ],
+}
+
+CSS_TOKENS = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|/\*.*?\*/', re.S)
+
+
+def minify_css(source):
+    """Strip comments and redundant whitespace, leaving strings untouched"""
+    parts = []
+    position = 0
+    for match in CSS_TOKENS.finditer(source):
+        parts.append(compact_css(source[position : match.start()]))
+        if match.group(1):
+            parts.append(match.group(1))
+        position = match.end()
+    parts.append(compact_css(source[position:]))
+    return "".join(parts).strip()
+
+
+def compact_css(text):
+    text = re.sub(r"\s+", " ", text)
+    # A space before ":" can matter in selectors ("a :hover"), so keep it
+    text = re.sub(r" ?([{};,>]) ?", r"\1", text)
+    text = re.sub(r": ", ":", text)
+    return text.replace(";}", "}")
+
+
+# Characters after which a "/" starts a regular expression, not a division
+REGEX_PREFIX = set("(,=:[!&|?{};+-*%<>~^") | {""}
+# Keywords after which a "/" starts a regular expression
+REGEX_KEYWORDS = {
+    "return",
+    "typeof",
+    "case",
+    "in",
+    "of",
+    "void",
+    "delete",
+    "throw",
+    "new",
+    "instanceof",
+    "yield",
+}
+# Spaces next to these can always be dropped
+JS_PUNCTUATION = set("{}()[];,:=<>&|!?")
+# Line breaks after these can be dropped without changing semicolon insertion
+JS_CONTINUATION = set("{;,")
+
+
+def unterminated(what, source, position):
+    line = source.count("\n", 0, position) + 1
+    return ValueError(f"Unterminated {what} starting on line {line}")
+
+
+def minify_js(source):
+    """Strip comments and redundant whitespace from a script
+
+    Identifiers are not renamed and line breaks that automatic semicolon
+    insertion may depend on are kept, so this is safe for scripts that
+    rely on it. Raises ValueError on an unterminated string, template,
+    regular expression or comment.
+    """
+    out = []
+    # Stack of open template literals; each entry counts the open braces
+    # of the ${...} expression currently being read inside it
+    templates = []
+    i = 0
+    length = len(source)
+
+    def regex_allowed():
+        """Whether a "/" here starts a regular expression, given what precedes it"""
+        # Identifier characters are appended one at a time
+        word = []
+        for chunk in reversed(out):
+            if chunk.isspace():
+                if word:
+                    break
+            elif len(chunk) == 1 and (chunk.isalnum() or chunk in "_$"):
+                word.append(chunk)
+            elif word:
+                break
+            else:
+                return chunk.rstrip()[-1] in REGEX_PREFIX
+        return not word or "".join(reversed(word)) in REGEX_KEYWORDS
+
+    while i < length:
+        char = source[i]
+
+        if char in "\"'":
+            end = i + 1
+            while end < length and source[end] not in (char, "\n"):
+                end += 2 if source[end] == "\\" else 1
+            if end >= length or source[end] != char:
+                raise unterminated("string", source, i)
+            out.append(source[i : end + 1])
+            i = end + 1
+        elif char == "`" or (char == "}" and templates and templates[-1] == 0):
+            if char == "}":
+                templates.pop()
+            # Read template text up to its end or the next ${
+            end = i + 1
+            while True:
+                if end >= length:
+                    raise unterminated("template literal", source, i)
+                if source[end] == "\\":
+                    end += 2
+                elif source[end] == "`":
+                    break
+                elif source.startswith("${", end):
+                    templates.append(0)
+                    end += 1
+                    break
+                else:
+                    end += 1
+            out.append(source[i : end + 1])
+            i = end + 1
+        elif source.startswith("//", i):
+            end = source.find("\n", i)
+            i = length if end < 0 else end
+        elif source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            if end < 0:
+                raise unterminated("comment", source, i)
+            i = end + 2
+            out.append(" ")
+        elif char == "/" and regex_allowed():
+            end = i + 1
+            in_class = False
+            while True:
+                if end >= length or source[end] == "\n":
+                    raise unterminated("regular expression", source, i)
+                if source[end] == "\\":
+                    end += 1
+                elif source[end] == "[":
+                    in_class = True
+                elif source[end] == "]":
+                    in_class = False
+                elif source[end] == "/" and not in_class:
+                    break
+                end += 1
+            end += 1
+            while end < length and source[end].isalpha():
+                end += 1
+            out.append(source[i:end])
+            i = end
+        elif char.isspace():
+            end = i
+            while end < length and source[end].isspace():
+                end += 1
+            out.append("\n" if "\n" in source[i:end] else " ")
+            i = end
+        else:
+            if templates and char == "{":
+                templates[-1] += 1
+            elif templates and char == "}":
+                templates[-1] -= 1
+            out.append(char)
+            i += 1
+
+    return squeeze_js_whitespace(out)
+
+
+def squeeze_js_whitespace(tokens):
+    result = []
+    for index, token in enumerate(tokens):
+        if token not in (" ", "\n"):
+            result.append(token)
+            continue
+        previous = result[-1][-1] if result else ""
+        if previous in ("", " ", "\n"):
+            continue
+        following = index + 1
+        while following < len(tokens) and tokens[following] in (" ", "\n"):
+            following += 1
+        if following == len(tokens):
+            continue
+        following = tokens[following][0]
+        if previous in JS_PUNCTUATION and token == " ":
+            continue
+        if following in JS_PUNCTUATION and (token == " " or following == "}"):
+            continue
+        if token == "\n" and previous in JS_CONTINUATION:
+            continue
+        result.append(token)
+    return "".join(result)
+
+
+MINIFIERS = {".css": minify_css, ".js": minify_js}
+
+
+def build(static_dir=STATIC_DIR, dist_dir=DIST_DIR):
+    """Write the bundles and their manifest; return the manifest"""
+    os.makedirs(dist_dir, exist_ok=True)
+    manifest = {}
+    for bundle, sources in BUNDLES.items():
+        name, extension = os.path.splitext(bundle)
+        minify = MINIFIERS[extension]
+        parts = []
+        for source in sources:
+            with open(os.path.join(static_dir, source), encoding="utf-8") as f:
+                text = f.read()
+            try:
+                parts.append(minify(text))
+            except ValueError as e:
+                raise ValueError(f"{source}: {e}") from None
+        data = "\n".join(parts).encode()
+
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        filename = f"{name}.{digest}{extension}"
+        write(os.path.join(dist_dir, filename), data)
+        write(os.path.join(dist_dir, filename + ".gz"), gzip.compress(data, 9, mtime=0))
+        if brotli:
+            write(os.path.join(dist_dir, filename + ".br"), brotli.compress(data))
+        manifest[bundle] = filename
+
+    write(
+        os.path.join(dist_dir, "manifest.json"),
+        json.dumps(manifest, indent=2).encode() + b"\n",
+    )
+    remove_stale(dist_dir, manifest)
+    return manifest
+
+
+def write(path, data):
+    """Write a file atomically, so a running server never serves half of it"""
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+def remove_stale(dist_dir, manifest):
+    """Delete bundles from earlier builds"""
+    current = set(manifest.values())
+    for filename in os.listdir(dist_dir):
+        base = re.sub(r"\.(gz|br)$", "", filename)
+        if filename != "manifest.json" and base not in current:
+            os.remove(os.path.join(dist_dir, filename))
+
+
+def main():
+    try:
+        manifest = build()
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    for bundle, filename in manifest.items():
+        path = os.path.join(DIST_DIR, filename)
+        sizes = [f"{os.path.getsize(path)} B"]
+        for suffix in (".gz", ".br"):
+            if os.path.exists(path + suffix):
+                sizes.append(f"{suffix[1:]} {os.path.getsize(path + suffix)} B")
+        print(f"{bundle} -> static/dist/{filename} ({', '.join(sizes)})")
+    if not brotli:
+        print("brotli is not installed, so only gzip variants were written")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
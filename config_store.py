@@ -0,0 +1,170 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+
+class ConfigStore:
+    """SQLite (WAL) persistence for session accounts and configs
+
+    Reads are only needed when a session is not in memory yet; the live
+    session data acts as the cache. Saves are queued per session and the
+    latest state of every queued session is written by a background thread
+    in a single transaction, so a burst of auto-save requests costs one
+    commit instead of one per keystroke.
+    """
+
+    def __init__(self, path, flush_delay=0.5):
+        self.path = path
+        self.flush_delay = flush_delay
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db_lock = threading.Lock()
+        self._pending = {}
+        self._writing = {}
+        self._condition = threading.Condition()
+        self._closed = False
+
+        with self._db_lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, "
+                "active_account_id TEXT, "
+                "updated_at REAL)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS accounts ("
+                "session_id TEXT, "
+                "account_id TEXT, "
+                "position INTEGER, "
+                "name TEXT, "
+                "config TEXT, "
+                "PRIMARY KEY (session_id, account_id))"
+            )
+
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def get_secret_key(self):
+        """Return the stored Flask secret key, creating one on first use
+
+        Session cookies must stay valid across restarts for the stored
+        sessions to be found again.
+        """
+        with self._db_lock, self._db:
+            row = self._db.execute(
+                "SELECT value FROM meta WHERE key = 'secret_key'"
+            ).fetchone()
+            if row:
+                return row[0]
+            secret_key = "discord-bot-" + str(uuid.uuid4())
+            self._db.execute(
+                "INSERT INTO meta (key, value) VALUES ('secret_key', ?)",
+                (secret_key,),
+            )
+            return secret_key
+
+    def load_session(self, session_id):
+        """Return (active_account_id, accounts) for a session, or None"""
+        with self._condition:
+            pending = self._pending.get(session_id) or self._writing.get(session_id)
+        if pending:
+            active_account_id, rows = pending
+        else:
+            with self._db_lock:
+                session_row = self._db.execute(
+                    "SELECT active_account_id FROM sessions WHERE session_id = ?",
+                    (session_id,),
+                ).fetchone()
+                if not session_row:
+                    return None
+                active_account_id = session_row[0]
+                rows = self._db.execute(
+                    "SELECT account_id, name, config FROM accounts "
+                    "WHERE session_id = ? ORDER BY position",
+                    (session_id,),
+                ).fetchall()
+
+        accounts = [
+            {"id": account_id, "name": name, "config": json.loads(config)}
+            for account_id, name, config in rows
+        ]
+        return active_account_id, accounts
+
+    def save_session(self, session_id, active_account_id, accounts):
+        """Queue a session's accounts to be written
+
+        The accounts are serialized immediately, so the caller may keep
+        mutating them afterwards. Later saves of the same session replace
+        earlier ones that were not written yet.
+        """
+        rows = [
+            (account["id"], account["name"], json.dumps(account["config"]))
+            for account in accounts
+        ]
+        with self._condition:
+            self._pending[session_id] = (active_account_id, rows)
+            self._condition.notify()
+
+    def flush(self):
+        """Write every queued session now"""
+        with self._condition:
+            pending, self._pending = self._pending, {}
+            self._writing.update(pending)
+        if pending:
+            try:
+                self._write(pending)
+            finally:
+                with self._condition:
+                    for session_id, state in pending.items():
+                        if self._writing.get(session_id) is state:
+                            del self._writing[session_id]
+
+    def close(self):
+        """Flush queued writes, stop the writer thread and close the database"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._writer.join()
+        self.flush()
+        with self._db_lock:
+            self._db.close()
+
+    def _write_loop(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+
+            # Let a burst of saves pile up before committing
+            time.sleep(self.flush_delay)
+            self.flush()
+
+    def _write(self, pending):
+        now = time.time()
+        with self._db_lock, self._db:
+            for session_id, (active_account_id, rows) in pending.items():
+                self._db.execute(
+                    "INSERT OR REPLACE INTO sessions "
+                    "(session_id, active_account_id, updated_at) VALUES (?, ?, ?)",
+                    (session_id, active_account_id, now),
+                )
+                self._db.execute(
+                    "DELETE FROM accounts WHERE session_id = ?", (session_id,)
+                )
+                self._db.executemany(
+                    "INSERT INTO accounts "
+                    "(session_id, account_id, position, name, config) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (session_id, account_id, position, name, config)
+                        for position, (account_id, name, config) in enumerate(rows)
+                    ],
+                )
@@ -0,0 +1,362 @@
+import bisect
+import contextlib
+import json
+import mmap
+import os
+import shutil
+import struct
+import threading
+from collections import OrderedDict
+
+# One index entry per record: timestamp, byte offset of the record in its segment
+INDEX_ENTRY = struct.Struct("<dQ")
+
+
+@contextlib.contextmanager
+def map_file(path):
+    """Memory-map a file read-only, yielding b"" for missing or empty files"""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        yield b""
+        return
+    with f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+class Index:
+    """Read-only sequence of (timestamp, offset) entries over an index buffer"""
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+
+    def __len__(self):
+        return len(self._buffer) // INDEX_ENTRY.size
+
+    def __getitem__(self, position):
+        return INDEX_ENTRY.unpack_from(self._buffer, position * INDEX_ENTRY.size)
+
+    def offset(self, position):
+        return self[position][1]
+
+    def timestamps(self):
+        """Sequence of timestamps only, for bisecting"""
+        return IndexTimestamps(self)
+
+
+class IndexTimestamps:
+    def __init__(self, index):
+        self._index = index
+
+    def __len__(self):
+        return len(self._index)
+
+    def __getitem__(self, position):
+        return self._index[position][0]
+
+
+class SessionJournal:
+    """Append-only log journal of one session, split into size-rotated segments
+
+    Each segment is a pair of files named after the sequence number of its
+    first record: `<seq>.log` holds one JSON array per line and `<seq>.idx`
+    the fixed-size index entries pointing into it. Reads map the files
+    instead of loading them, so only the requested records are touched.
+    """
+
+    def __init__(self, directory, max_segment_bytes, max_segments):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segments = max_segments
+        self.lock = threading.Lock()
+        self.closed = False
+        self._log_file = None
+        self._index_file = None
+
+        os.makedirs(directory, exist_ok=True)
+        self._segments = sorted(
+            int(name[:-4]) for name in os.listdir(directory) if name.endswith(".log")
+        )
+        if self._segments:
+            count, self._log_size = self._recover(self._segments[-1])
+            self._next_seq = self._segments[-1] + count
+        else:
+            self._segments = [1]
+            self._log_size = 0
+            self._next_seq = 1
+
+    def _path(self, first_seq, extension):
+        return os.path.join(self.directory, f"{first_seq:012d}{extension}")
+
+    def _recover(self, first_seq):
+        """Drop a partially written record at the end of a segment
+
+        Returns the number of complete records and the segment's size.
+        """
+        index_path = self._path(first_seq, ".idx")
+        log_path = self._path(first_seq, ".log")
+        index_size = os.path.getsize(index_path) if os.path.exists(index_path) else 0
+        count = index_size // INDEX_ENTRY.size
+        log_size = 0
+        if count:
+            with map_file(index_path) as index_buffer, map_file(log_path) as log:
+                offset = Index(index_buffer).offset(count - 1)
+                end = log.find(b"\n", offset)
+                log_size = min(offset, len(log)) if end < 0 else end + 1
+            if end < 0:
+                count -= 1
+
+        with open(index_path, "ab") as f:
+            f.truncate(count * INDEX_ENTRY.size)
+        with open(log_path, "ab") as f:
+            f.truncate(log_size)
+        return count, log_size
+
+    def append(self, timestamp, level, kind, message):
+        """Write a record and return its sequence number, or None once closed"""
+        line = json.dumps(
+            [timestamp, level, kind, message], ensure_ascii=False, separators=(",", ":")
+        ).encode() + b"\n"
+        with self.lock:
+            if self.closed:
+                return None
+            if self._log_size and self._log_size + len(line) > self.max_segment_bytes:
+                self._rotate()
+            if self._log_file is None:
+                self._open()
+
+            self._log_file.write(line)
+            self._index_file.write(INDEX_ENTRY.pack(timestamp, self._log_size))
+            self._log_file.flush()
+            self._index_file.flush()
+
+            self._log_size += len(line)
+            seq = self._next_seq
+            self._next_seq += 1
+            return seq
+
+    def _open(self):
+        first_seq = self._segments[-1]
+        self._log_file = open(self._path(first_seq, ".log"), "ab")
+        self._index_file = open(self._path(first_seq, ".idx"), "ab")
+
+    def _rotate(self):
+        self._close()
+        self._segments.append(self._next_seq)
+        self._log_size = 0
+        while len(self._segments) > self.max_segments:
+            first_seq = self._segments.pop(0)
+            for extension in (".log", ".idx"):
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(self._path(first_seq, extension))
+
+    def _close(self):
+        if self._log_file is not None:
+            self._log_file.close()
+            self._index_file.close()
+            self._log_file = self._index_file = None
+
+    def close(self):
+        """Close the segment files; later appends are refused, reads still work"""
+        with self.lock:
+            self.closed = True
+            self._close()
+
+    def _read_segment(self, first_seq, start, end):
+        """Return (first record position, lines) for a slice of a segment
+
+        start and end are positions within the segment; None for end means
+        up to the last record. Must be called with the lock held.
+        """
+        with map_file(self._path(first_seq, ".idx")) as index_buffer:
+            index = Index(index_buffer)
+            count = len(index)
+            end = count if end is None else min(end, count)
+            if start >= end:
+                return start, []
+            start_offset = index.offset(start)
+            end_offset = index.offset(end) if end < count else None
+        with map_file(self._path(first_seq, ".log")) as log:
+            chunk = log[start_offset:end_offset]
+        return start, chunk.splitlines()
+
+    def _decode(self, first_seq, start, lines):
+        for position, line in enumerate(lines, start):
+            timestamp, level, kind, message = json.loads(line)
+            yield first_seq + position, timestamp, level, kind, message
+
+    def tail(self, count):
+        """Return the last `count` records, oldest first
+
+        Records are (seq, timestamp, level, kind, message) tuples.
+        """
+        with self.lock:
+            chunks = []
+            remaining = count
+            for first_seq in reversed(self._segments):
+                if remaining <= 0:
+                    break
+                with map_file(self._path(first_seq, ".idx")) as index_buffer:
+                    length = len(Index(index_buffer))
+                start = max(0, length - remaining)
+                chunks.append((first_seq, *self._read_segment(first_seq, start, None)))
+                remaining -= length - start
+
+        records = []
+        for first_seq, start, lines in reversed(chunks):
+            records.extend(self._decode(first_seq, start, lines))
+        return records
+
+    def read(self, since=None, until=None, limit=None):
+        """Yield records with since <= timestamp < until, oldest first
+
+        Segments are located by bisecting their indexes, and the lock is
+        only held while a segment's matching bytes are copied out, so a long
+        read does not block writers.
+        """
+        with self.lock:
+            segments = list(self._segments)
+
+        for first_seq in segments:
+            if limit is not None and limit <= 0:
+                return
+            with self.lock:
+                with map_file(self._path(first_seq, ".idx")) as index_buffer:
+                    timestamps = Index(index_buffer).timestamps()
+                    if not len(timestamps):
+                        continue
+                    if since is not None and timestamps[len(timestamps) - 1] < since:
+                        continue
+                    if until is not None and timestamps[0] >= until:
+                        return
+                    start = end = None
+                    if since is not None:
+                        start = bisect.bisect_left(timestamps, since)
+                    if until is not None:
+                        end = bisect.bisect_left(timestamps, until)
+                start = start or 0
+                if limit is not None:
+                    end = min(end if end is not None else start + limit, start + limit)
+                start, lines = self._read_segment(first_seq, start, end)
+
+            for record in self._decode(first_seq, start, lines):
+                yield record
+            if limit is not None:
+                limit -= len(lines)
+
+
+class LogJournal:
+    """Per-session on-disk log journals under one directory
+
+    Every session gets a subdirectory of segments (see SessionJournal).
+    Only the `max_open` most recently used journals are kept, with their
+    files open; the others are reopened on their next use. When a new
+    session's journal is created and there are more than `max_sessions`
+    session directories, the least recently written ones are deleted, so
+    the directory holds at most about max_sessions * max_segments *
+    max_segment_bytes.
+    """
+
+    def __init__(
+        self,
+        path,
+        max_segment_bytes=8 * 2**20,
+        max_segments=16,
+        max_open=64,
+        max_sessions=1000,
+    ):
+        self.path = path
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segments = max_segments
+        self.max_open = max_open
+        self.max_sessions = max_sessions
+        # Open journals, least recently used first
+        self._journals = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    def journal(self, session_id, create=True):
+        """Return the journal of a session
+
+        Without `create`, returns None for a session that has no journal on
+        disk instead of creating its directory.
+        """
+        if not session_id.replace("-", "").isalnum():
+            raise ValueError(f"Invalid session id: {session_id!r}")
+        with self._lock:
+            journal = self._journals.get(session_id)
+            if journal is None:
+                directory = os.path.join(self.path, session_id)
+                new = not os.path.isdir(directory)
+                if new and not create:
+                    return None
+                journal = self._journals[session_id] = SessionJournal(
+                    directory, self.max_segment_bytes, self.max_segments
+                )
+                if new:
+                    self._prune()
+            self._journals.move_to_end(session_id)
+            # Closed under our lock, so the session cannot be reopened by
+            # another journal while an append to this one is still running
+            while len(self._journals) > self.max_open:
+                _, oldest = self._journals.popitem(last=False)
+                oldest.close()
+            return journal
+
+    def _prune(self):
+        """Delete the least recently written sessions beyond max_sessions
+
+        Prunes down to 90% of the limit, so the directories are only
+        scanned again after a batch of new sessions. Must be called with
+        the lock held.
+        """
+        names = [
+            name
+            for name in os.listdir(self.path)
+            if os.path.isdir(os.path.join(self.path, name))
+        ]
+        if len(names) <= self.max_sessions:
+            return
+        candidates = sorted(
+            (self._last_write(name), name)
+            for name in names
+            if name not in self._journals
+        )
+        excess = len(names) - self.max_sessions * 9 // 10
+        for _, name in candidates[:excess]:
+            shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+
+    def _last_write(self, name):
+        directory = os.path.join(self.path, name)
+        try:
+            logs = [entry for entry in os.listdir(directory) if entry.endswith(".log")]
+            return os.path.getmtime(os.path.join(directory, max(logs, default="")))
+        except OSError:
+            return 0
+
+    def append(self, session_id, timestamp, level, kind, message):
+        """Write a record to a session's journal and return its sequence number"""
+        while True:
+            seq = self.journal(session_id).append(timestamp, level, kind, message)
+            # None if the journal was closed after we got it; use a new one
+            if seq is not None:
+                return seq
+
+    def tail(self, session_id, count):
+        journal = self.journal(session_id, create=False)
+        return journal.tail(count) if journal else []
+
+    def read(self, session_id, since=None, until=None, limit=None):
+        journal = self.journal(session_id, create=False)
+        return journal.read(since, until, limit) if journal else iter(())
+
+    def close(self):
+        """Close every open journal"""
+        with self._lock:
+            journals, self._journals = list(self._journals.values()), OrderedDict()
+        for journal in journals:
+            journal.close()
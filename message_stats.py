@@ -0,0 +1,183 @@
+import hashlib
+import uuid
+from array import array
+
+# Per-minute buckets for the last hour, per-hour buckets for the last two days
+MINUTE_BUCKETS = 60
+HOUR_BUCKETS = 48
+
+
+def message_id(message):
+    """Stable short id of a message text"""
+    return hashlib.blake2b(message.encode(), digest_size=6).hexdigest()
+
+
+class Buckets:
+    """Fixed ring of counters, each covering `width` seconds
+
+    A slot holds the index (time // width) of the bucket it currently
+    counts and the version of its last change; a slot is reused once its
+    bucket falls out of the window.
+    """
+
+    __slots__ = ("width", "starts", "counts", "versions")
+
+    def __init__(self, size, width):
+        self.width = width
+        self.starts = array("q", [-1]) * size
+        self.counts = array("L", [0]) * size
+        self.versions = array("Q", [0]) * size
+
+    def add(self, timestamp, version):
+        bucket = int(timestamp // self.width)
+        slot = bucket % len(self.counts)
+        if self.starts[slot] != bucket:
+            self.starts[slot] = bucket
+            self.counts[slot] = 0
+        self.counts[slot] += 1
+        self.versions[slot] = version
+
+    def changed(self, since, now):
+        """Return the buckets changed after version `since`, oldest first
+
+        Buckets are [start time, count] pairs; those that fell out of the
+        window by `now` are left out.
+        """
+        oldest = int(now // self.width) - len(self.counts) + 1
+        return sorted(
+            [start * self.width, count]
+            for start, count, version in zip(self.starts, self.counts, self.versions)
+            if version > since and start >= oldest
+        )
+
+    def to_dict(self):
+        return {
+            "starts": self.starts.tolist(),
+            "counts": self.counts.tolist(),
+            "versions": self.versions.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data, width):
+        buckets = cls(len(data["counts"]), width)
+        buckets.starts = array("q", data["starts"])
+        buckets.counts = array("L", data["counts"])
+        buckets.versions = array("Q", data["versions"])
+        return buckets
+
+
+class MessageSeries:
+    """Sends of one message: a total and its minute and hour buckets"""
+
+    __slots__ = ("id", "message", "count", "version", "minutes", "hours")
+
+    def __init__(self, message):
+        self.id = message_id(message)
+        self.message = message
+        self.count = 0
+        self.version = 0
+        self.minutes = Buckets(MINUTE_BUCKETS, 60)
+        self.hours = Buckets(HOUR_BUCKETS, 3600)
+
+    def to_dict(self):
+        return {
+            "message": self.message,
+            "count": self.count,
+            "version": self.version,
+            "minutes": self.minutes.to_dict(),
+            "hours": self.hours.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        series = cls(data["message"])
+        series.count = data["count"]
+        series.version = data["version"]
+        series.minutes = Buckets.from_dict(data["minutes"], 60)
+        series.hours = Buckets.from_dict(data["hours"], 3600)
+        return series
+
+
+class MessageStats:
+    """Send counts per message, with per-minute and per-hour history
+
+    Every recorded send bumps `version`, and each message and bucket keeps
+    the version that last changed it, so delta(since) only returns what a
+    client that has seen `since` is missing. Versions are only comparable
+    within one `epoch`, which changes when the stats start from scratch.
+    """
+
+    def __init__(self):
+        self.epoch = uuid.uuid4().hex[:8]
+        self.version = 0
+        # Clients that saw a version before the last reset must start over
+        self.reset_version = 0
+        self._series = {}
+
+    def __len__(self):
+        return len(self._series)
+
+    def record(self, message, timestamp):
+        """Count one send of `message` at `timestamp` and return its series"""
+        self.version += 1
+        series = self._series.get(message)
+        if series is None:
+            series = self._series[message] = MessageSeries(message)
+        series.count += 1
+        series.version = self.version
+        series.minutes.add(timestamp, self.version)
+        series.hours.add(timestamp, self.version)
+        return series
+
+    def reset(self):
+        self.version += 1
+        self.reset_version = self.version
+        self._series = {}
+
+    def delta(self, since, now, epoch=None):
+        """Return the messages and buckets changed after version `since`
+
+        When `since` is from another epoch (e.g. before a restart) or
+        predates the last reset, everything is returned with "reset" set,
+        and the client should replace what it has.
+        """
+        reset = since > 0 and (
+            epoch != self.epoch or since < self.reset_version or since > self.version
+        )
+        if reset:
+            since = 0
+        return {
+            "epoch": self.epoch,
+            "version": self.version,
+            "reset": reset,
+            "messages": [
+                {
+                    "id": series.id,
+                    "message": series.message,
+                    "count": series.count,
+                    "minutes": series.minutes.changed(since, now),
+                    "hours": series.hours.changed(since, now),
+                }
+                for series in self._series.values()
+                if series.version > since
+            ],
+        }
+
+    def to_dict(self):
+        return {
+            "epoch": self.epoch,
+            "version": self.version,
+            "reset_version": self.reset_version,
+            "messages": [series.to_dict() for series in self._series.values()],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.epoch = data["epoch"]
+        stats.version = data["version"]
+        stats.reset_version = data["reset_version"]
+        for series_data in data["messages"]:
+            series = MessageSeries.from_dict(series_data)
+            stats._series[series.message] = series
+        return stats
@@ -0,0 +1,273 @@
+import hashlib
+import json
+
+
+def encode(value):
+    return json.dumps(value, separators=(",", ":"))
+
+
+def content_tag(text):
+    """Short hash of an encoding, used as its ETag"""
+    return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+
+
+def parse_time_of_day(value):
+    """Parse an "HH:MM" string into minutes after midnight
+
+    Raises ValueError if the string is not a valid time of day.
+    """
+    try:
+        hour, minute = (int(part) for part in value.split(":"))
+    except (AttributeError, ValueError):
+        raise ValueError(f"Invalid time: {value!r}")
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ValueError(f"Invalid time: {value!r}")
+    return hour * 60 + minute
+
+
+def format_time_of_day(minutes):
+    """Format minutes after midnight as an "HH:MM" string"""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def compile_schedule(send_times):
+    """Compile "HH:MM" strings into a sorted tuple of unique minutes after midnight"""
+    return tuple(sorted({parse_time_of_day(send_time) for send_time in send_times}))
+
+
+class Config:
+    """Settings of one account
+
+    Reads also work like a read-only mapping (config["mode"],
+    config.get("dry_run"), {**config}), which is what the bot loops and
+    get_config_error use, so they accept plain dicts as well.
+
+    `schedule` is send_times compiled to minutes after midnight. It is
+    compiled on first use and again only after send_times is assigned.
+    """
+
+    FIELDS = (
+        "token",
+        "channel_id",
+        "messages",
+        "mode",
+        "delay_enabled",
+        "min_delay",
+        "max_delay",
+        "send_times",
+        "spam_interval",
+        "window_start",
+        "window_end",
+        "messages_count",
+        "dry_run",
+    )
+
+    # send_times is a property over _send_times, to keep schedule current
+    __slots__ = tuple(name for name in FIELDS if name != "send_times") + (
+        "_send_times",
+        "_schedule",
+    )
+
+    def __init__(self, **values):
+        for name in self.FIELDS:
+            setattr(self, name, values[name])
+
+    @classmethod
+    def from_dict(cls, data, defaults):
+        """Build a config from a dict, taking missing fields from defaults"""
+        return cls(**{name: data.get(name, defaults[name]) for name in cls.FIELDS})
+
+    @property
+    def send_times(self):
+        return self._send_times
+
+    @send_times.setter
+    def send_times(self, send_times):
+        self._send_times = send_times
+        self._schedule = None
+
+    @property
+    def schedule(self):
+        """Raises ValueError if send_times holds an invalid time"""
+        if self._schedule is None:
+            self._schedule = compile_schedule(self._send_times)
+        return self._schedule
+
+    def to_dict(self):
+        return {
+            name: list(value) if isinstance(value, list) else value
+            for name, value in zip(self.FIELDS, self.values())
+        }
+
+    def keys(self):
+        return self.FIELDS
+
+    def values(self):
+        return [getattr(self, name) for name in self.FIELDS]
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.FIELDS else default
+
+
+class Account:
+    """A named config, with its JSON encodings cached until it changes"""
+
+    __slots__ = (
+        "id",
+        "name",
+        "config",
+        "version",
+        "_json",
+        "_config_json",
+        "_config_etag",
+    )
+
+    def __init__(self, id, name, config):
+        self.id = id
+        self.name = name
+        self.config = config
+        self.version = 0
+        self._json = None
+        self._config_json = None
+        self._config_etag = None
+
+    def changed(self):
+        """Bump the version and drop the cached encodings"""
+        self.version += 1
+        self._json = None
+        self._config_json = None
+        self._config_etag = None
+
+    def to_dict(self):
+        return {"id": self.id, "name": self.name, "config": self.config.to_dict()}
+
+    def to_json(self):
+        if self._json is None:
+            self._json = encode(self.to_dict())
+        return self._json
+
+    def config_json(self):
+        """The config alone, encoded as JSON"""
+        if self._config_json is None:
+            self._config_json = encode(self.config.to_dict())
+        return self._config_json
+
+    def config_etag(self):
+        if self._config_etag is None:
+            self._config_etag = content_tag(self.config_json())
+        return self._config_etag
+
+
+class Accounts:
+    """A session's accounts in order, indexed by id, and the active one
+
+    Change accounts through these methods, or call changed(account) after
+    editing one in place, so that versions and cached encodings stay
+    current. Only the accounts that changed are re-encoded.
+    """
+
+    __slots__ = ("_accounts", "_index", "active_id", "version", "_json", "_etag")
+
+    def __init__(self, accounts, active_id=None):
+        self._accounts = list(accounts)
+        self._index = {account.id: account for account in self._accounts}
+        if active_id not in self._index and self._accounts:
+            active_id = self._accounts[0].id
+        self.active_id = active_id
+        self.version = 0
+        self._json = None
+        self._etag = None
+
+    @classmethod
+    def from_dicts(cls, accounts, active_id, defaults):
+        """Build accounts from their dict form, filling configs from defaults"""
+        return cls(
+            [
+                Account(
+                    account["id"],
+                    account["name"],
+                    Config.from_dict(account["config"], defaults),
+                )
+                for account in accounts
+            ],
+            active_id,
+        )
+
+    def to_dicts(self):
+        return [account.to_dict() for account in self._accounts]
+
+    def __len__(self):
+        return len(self._accounts)
+
+    def __iter__(self):
+        return iter(self._accounts)
+
+    def get(self, account_id):
+        return self._index.get(account_id)
+
+    @property
+    def active(self):
+        return self._index.get(self.active_id)
+
+    def add(self, account):
+        self._accounts.append(account)
+        self._index[account.id] = account
+        if self.active_id is None:
+            self.active_id = account.id
+        self.changed()
+
+    def remove(self, account_id):
+        """Remove an account and return it, or None if there is no such account
+
+        Removing the active account activates the one before it (or the new
+        first one).
+        """
+        account = self._index.pop(account_id, None)
+        if account is None:
+            return None
+        position = self._accounts.index(account)
+        del self._accounts[position]
+        if self.active_id == account_id:
+            self.active_id = (
+                self._accounts[max(0, position - 1)].id if self._accounts else None
+            )
+        self.changed()
+        return account
+
+    def activate(self, account_id):
+        """Make an account the active one and return it, or None if unknown"""
+        account = self._index.get(account_id)
+        if account is not None:
+            self.active_id = account_id
+            self.changed()
+        return account
+
+    def changed(self, account=None):
+        """Record a change, to `account` if given, dropping cached encodings"""
+        if account is not None:
+            account.changed()
+        self.version += 1
+        self._json = None
+        self._etag = None
+
+    def to_json(self):
+        """Encode as the /api/accounts response body"""
+        if self._json is None:
+            self._json = (
+                '{"accounts":['
+                + ",".join(account.to_json() for account in self._accounts)
+                + '],"active_account_id":'
+                + encode(self.active_id)
+                + "}"
+            )
+        return self._json
+
+    def etag(self):
+        if self._etag is None:
+            self._etag = content_tag(self.to_json())
+        return self._etag
@@ -0,0 +1,114 @@
+"""Run the dashboard under waitress, a multi-threaded production WSGI server
+
+    python serve.py --port 5000 --threads 32
+
+On SIGTERM or Ctrl+C every running bot is told to stop and given
+--shutdown-timeout seconds to finish, then the config store, snapshot and
+log journal are flushed before the server exits. A second signal exits
+without waiting.
+"""
+
+import argparse
+import logging
+import signal
+import sys
+
+from waitress import create_server
+
+logger = logging.getLogger("graphite")
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=32,
+        help="worker threads; every open dashboard holds one for its event stream",
+    )
+    parser.add_argument(
+        "--reserved-threads",
+        type=int,
+        default=8,
+        help="threads kept free of event streams for the other requests; "
+        "dashboards beyond --threads minus this fall back to polling",
+    )
+    parser.add_argument(
+        "--connection-limit",
+        type=int,
+        default=200,
+        help="open connections accepted before new ones have to wait",
+    )
+    parser.add_argument(
+        "--channel-timeout",
+        type=int,
+        default=120,
+        help="seconds before an idle or stalled connection (including a "
+        "keep-alive one) is closed; keep above the 15s event keepalive",
+    )
+    parser.add_argument(
+        "--discord-timeout",
+        type=float,
+        default=10,
+        help="seconds before a Discord API request is abandoned",
+    )
+    parser.add_argument(
+        "--shutdown-timeout",
+        type=float,
+        default=10,
+        help="seconds to wait for running bots to stop on shutdown",
+    )
+    args = parser.parse_args(argv)
+    if not 0 < args.reserved_threads < args.threads:
+        parser.error("--reserved-threads must be between 1 and --threads - 1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO,
+        format="[%(asctime)s] %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    # Imported once logging is set up, so messages about the stores it
+    # opens on import are not lost
+    import auto_message
+
+    auto_message.discord_request_timeout = args.discord_timeout
+    auto_message.limit_event_streams(args.threads - args.reserved_threads)
+    server = create_server(
+        auto_message.app,
+        host=args.host,
+        port=args.port,
+        threads=args.threads,
+        connection_limit=args.connection_limit,
+        channel_timeout=args.channel_timeout,
+        ident="graphite",
+    )
+
+    def stop(signum, frame):
+        logger.info("Received %s, shutting down", signal.Signals(signum).name)
+        # Runs before waitress stops its workers, so event streams end
+        # and free their threads instead of holding up the exit
+        auto_message.shutdown(args.shutdown_timeout)
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    logger.info(
+        "Serving on http://%s:%d with %d threads", args.host, args.port, args.threads
+    )
+    try:
+        server.run()
+    finally:
+        auto_message.shutdown(args.shutdown_timeout)
+        server.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
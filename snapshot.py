@@ -0,0 +1,155 @@
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+
+logger = logging.getLogger("graphite")
+
+MAGIC = b"GRSNAP01"
+# magic, metadata length, number of sessions
+HEADER = struct.Struct("<8sII")
+# session id length, state length, saved at (Unix time)
+ENTRY = struct.Struct("<HId")
+
+
+class SnapshotStore:
+    """Binary snapshots of every session's state in a single file
+
+    The file is a header, a JSON metadata blob, then one entry per session
+    holding its id and its zlib-compressed JSON state. Loading only walks
+    the entry headers; a session's state is decompressed the first time it
+    is asked for. Writes go to a temporary file that atomically replaces
+    the previous snapshot, so a crash mid-write keeps the last good one.
+
+    Sessions from the previous snapshot that were not passed to `save`
+    (never accessed since startup, or evicted from memory) are carried
+    over as they are until they are older than `max_age` seconds.
+    """
+
+    def __init__(self, path, interval=60, max_age=30 * 24 * 60 * 60):
+        self.path = path
+        self.interval = interval
+        self.max_age = max_age
+        self.meta = {}
+        # session id -> (compressed state, saved at)
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+
+        try:
+            magic, meta_length, count = HEADER.unpack_from(data)
+            if magic != MAGIC:
+                raise ValueError("not a snapshot file")
+            offset = HEADER.size
+            meta = json.loads(data[offset : offset + meta_length])
+            offset += meta_length
+
+            entries = {}
+            view = memoryview(data)
+            for _ in range(count):
+                id_length, state_length, saved_at = ENTRY.unpack_from(data, offset)
+                offset += ENTRY.size
+                session_id = data[offset : offset + id_length].decode()
+                offset += id_length
+                entries[session_id] = (view[offset : offset + state_length], saved_at)
+                offset += state_length
+            if offset > len(data):
+                raise ValueError("truncated snapshot")
+        except (ValueError, struct.error) as e:
+            logger.warning("Ignoring unreadable snapshot %s: %s", self.path, e)
+            return
+
+        self.meta = meta
+        self._entries = entries
+
+    def load(self, session_id):
+        """Return a session's saved state, or None
+
+        An entry that cannot be decoded is logged and dropped, so the
+        session starts fresh and later snapshots do not carry it over.
+        """
+        with self._lock:
+            entry = self._entries.get(session_id)
+        if entry is None:
+            return None
+        try:
+            return json.loads(zlib.decompress(entry[0]))
+        except (zlib.error, ValueError) as e:
+            logger.warning(
+                "Dropping unreadable snapshot of session %s: %s", session_id, e
+            )
+            with self._lock:
+                if self._entries.get(session_id) is entry:
+                    del self._entries[session_id]
+            return None
+
+    def save(self, meta, sessions):
+        """Write a new snapshot
+
+        `sessions` is an iterable of (session_id, saved_at, encoded) with
+        each state already encoded as JSON bytes, so callers can take a
+        consistent copy under their own locks and leave the rest to us.
+        """
+        with self._save_lock:
+            entries = {
+                session_id: (zlib.compress(encoded), saved_at)
+                for session_id, saved_at, encoded in sessions
+            }
+            cutoff = time.time() - self.max_age
+            with self._lock:
+                for session_id, entry in self._entries.items():
+                    if session_id not in entries and entry[1] >= cutoff:
+                        entries[session_id] = entry
+
+            meta_bytes = json.dumps(meta).encode()
+            chunks = [HEADER.pack(MAGIC, len(meta_bytes), len(entries)), meta_bytes]
+            for session_id, (state, saved_at) in entries.items():
+                id_bytes = session_id.encode()
+                chunks.append(ENTRY.pack(len(id_bytes), len(state), saved_at))
+                chunks.append(id_bytes)
+                chunks.append(state)
+
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "wb") as f:
+                f.writelines(chunks)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+
+            with self._lock:
+                self.meta = meta
+                self._entries = entries
+
+    def start(self, collect):
+        """Save `collect()` (a (meta, sessions) pair) every `interval` seconds"""
+        self._thread = threading.Thread(
+            target=self._save_loop, args=(collect,), daemon=True
+        )
+        self._thread.start()
+
+    def close(self, collect):
+        """Stop the periodic saves and write a final snapshot"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+        self.save(*collect())
+
+    def _save_loop(self, collect):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.save(*collect())
+            except Exception:
+                logger.exception("Failed to write snapshot %s", self.path)
@@ -75,8 +75,11 @@ async function saveConfig() {
     const result = await response.json();
 
     if (result.success) {
-      // Reload configs to update the config info in the manager
-      await loadConfigs();
+      // Keep the config manager's copy in sync without refetching every account
+      const activeConfig = configs.find((c) => c.id === activeConfigId);
+      if (activeConfig) {
+        Object.assign(activeConfig.config, config);
+      }
       showSaveNotification();
     } else {
       showSaveError(result.message || "Failed to save configuration");
@@ -56,32 +56,103 @@ function updateStatus(running) {
 
 async function updateConsole() {
   try {
-    const response = await fetch("/api/logs");
+    const response = await fetch(`/api/logs?after=${lastLogSeq}`);
     const data = await response.json();
-    const consoleWindow = document.getElementById("consoleWindow");
-
-    if (data.logs && data.logs.length > 0) {
-      consoleWindow.innerHTML = data.logs
-        .map((log) => {
-          const isError = /Error|Failed|error|failed/i.test(log);
-          const className = isError ? "log-entry error" : "log-entry";
-          return `<div class="${className}">${escapeHtml(log)}</div>`;
-        })
-        .join("");
-      consoleWindow.scrollTop = consoleWindow.scrollHeight;
-
-      // Save logs to localStorage
-      saveLogsToStorage(data.logs);
-
-      // Update log buttons state
-      updateLogButtonsState();
+
+    if (data.gap) {
+      // Fell behind the server buffer: it sent everything it still holds
+      renderLogs(data.entries, data.last_seq);
+    } else {
+      data.entries.forEach(appendLogEntry);
     }
   } catch (error) {
     console.error("Failed to fetch logs:", error);
   }
 }
 
+// Entries currently mirrored from the server (kept for localStorage export)
+let consoleLines = [];
+// Sequence number of the newest server log entry displayed
+let lastLogSeq = 0;
+// Set when the server keeps console history on disk (GRAPHITE_LOG_DIR)
+let logJournalEnabled = false;
+
+// Only keep what the console needs; logs saved by older versions are strings
+function toConsoleLine(entry) {
+  if (typeof entry === "string") return { line: entry, level: "info" };
+  return { line: entry.line, level: entry.level };
+}
+
+function logClassName(entry) {
+  return entry.level === "error" ? "log-entry error" : "log-entry";
+}
+
+function createLogElement(entry) {
+  const element = document.createElement("div");
+  element.className = logClassName(entry);
+  element.textContent = entry.line;
+  return element;
+}
+
+function renderLogLines(lines) {
+  const consoleWindow = document.getElementById("consoleWindow");
+  consoleWindow.innerHTML = lines
+    .map((entry) => {
+      const className = logClassName(entry);
+      return `<div class="${className}">${escapeHtml(entry.line)}</div>`;
+    })
+    .join("");
+  consoleWindow.scrollTop = consoleWindow.scrollHeight;
+}
+
+function renderLogs(entries, lastSeq) {
+  lastLogSeq = lastSeq;
+  if (entries.length === 0) return;
+
+  consoleLines = entries.map(toConsoleLine);
+  renderLogLines(consoleLines);
+
+  saveLogsToStorage(consoleLines);
+  updateLogButtonsState();
+}
+
+function appendLogEntry(entry) {
+  if (entry.seq <= lastLogSeq) return;
+  lastLogSeq = entry.seq;
+
+  const line = toConsoleLine(entry);
+  const consoleWindow = document.getElementById("consoleWindow");
+  consoleWindow.appendChild(createLogElement(line));
+  consoleLines.push(line);
+
+  // Mirror the server-side cap so the DOM does not grow forever
+  while (consoleLines.length > MAX_CONSOLE_LINES) {
+    consoleLines.shift();
+    if (consoleWindow.firstChild) {
+      consoleWindow.removeChild(consoleWindow.firstChild);
+    }
+  }
+  consoleWindow.scrollTop = consoleWindow.scrollHeight;
+
+  scheduleLogsSave();
+}
+
+// Batch localStorage writes when many lines arrive at once
+let logsSaveTimeout = null;
+
+function scheduleLogsSave() {
+  if (logsSaveTimeout) return;
+  logsSaveTimeout = setTimeout(() => {
+    logsSaveTimeout = null;
+    saveLogsToStorage(consoleLines);
+    updateLogButtonsState();
+  }, 1000);
+}
+
 function saveLogsToStorage(logs) {
+  // The server already keeps the history
+  if (logJournalEnabled) return;
+
   try {
     localStorage.setItem("graphite_logs", JSON.stringify(logs));
     localStorage.setItem("graphite_logs_timestamp", new Date().toISOString());
@@ -90,20 +161,52 @@ function saveLogsToStorage(logs) {
   }
 }
 
+function getSavedLogText() {
+  const savedLogs = localStorage.getItem("graphite_logs");
+  if (!savedLogs) return null;
+  return JSON.parse(savedLogs)
+    .map((entry) => toConsoleLine(entry).line)
+    .join("\n");
+}
+
+// Load history from the server journal, or from localStorage without one
+async function loadLogHistory() {
+  try {
+    const response = await fetch(`/api/logs/history?tail=${MAX_CONSOLE_LINES}`);
+    if (response.status === 404) {
+      loadLogsFromStorage();
+      return;
+    }
+    const data = await response.json();
+
+    logJournalEnabled = true;
+    localStorage.removeItem("graphite_logs");
+    localStorage.removeItem("graphite_logs_timestamp");
+    // Lines already received from the live stream are newer than the history
+    if (consoleLines.length === 0 && data.entries.length > 0) {
+      consoleLines = data.entries.map(toConsoleLine);
+      renderLogLines(consoleLines);
+    }
+    updateLogButtonsState();
+  } catch (error) {
+    console.error("Failed to load log history:", error);
+    loadLogsFromStorage();
+  }
+}
+
+async function getLogText() {
+  if (!logJournalEnabled) return getSavedLogText();
+
+  const response = await fetch("/api/logs/history?format=text");
+  const text = await response.text();
+  return text ? text.replace(/\n$/, "") : null;
+}
+
 function loadLogsFromStorage() {
   try {
     const savedLogs = localStorage.getItem("graphite_logs");
     if (savedLogs) {
-      const logs = JSON.parse(savedLogs);
-      const consoleWindow = document.getElementById("consoleWindow");
-      consoleWindow.innerHTML = logs
-        .map((log) => {
-          const isError = /Error|Failed|error|failed/i.test(log);
-          const className = isError ? "log-entry error" : "log-entry";
-          return `<div class="${className}">${escapeHtml(log)}</div>`;
-        })
-        .join("");
-      consoleWindow.scrollTop = consoleWindow.scrollHeight;
+      renderLogLines(JSON.parse(savedLogs).map(toConsoleLine));
     }
     updateLogButtonsState();
   } catch (error) {
@@ -111,15 +214,13 @@ function loadLogsFromStorage() {
   }
 }
 
-function exportLogsToFile() {
+async function exportLogsToFile() {
   try {
-    const savedLogs = localStorage.getItem("graphite_logs");
-    if (!savedLogs) {
+    const logsText = await getLogText();
+    if (logsText === null) {
       return;
     }
 
-    const logs = JSON.parse(savedLogs);
-    const logsText = logs.join("\n");
     const timestamp = new Date().toISOString().replace(/[:.]/g, "-");
     const filename = `graphite-logs-${timestamp}.txt`;
 
@@ -142,13 +243,11 @@ function exportLogsToFile() {
 
 async function copyLogsToClipboard() {
   try {
-    const savedLogs = localStorage.getItem("graphite_logs");
-    if (!savedLogs) {
+    const logsText = await getLogText();
+    if (logsText === null) {
       return;
     }
 
-    const logs = JSON.parse(savedLogs);
-    const logsText = logs.join("\n");
 
     await navigator.clipboard.writeText(logsText);
     showNotification("Logs copied to clipboard");
@@ -159,8 +258,13 @@ async function copyLogsToClipboard() {
 }
 
 function updateLogButtonsState() {
-  const savedLogs = localStorage.getItem("graphite_logs");
-  const hasLogs = savedLogs && JSON.parse(savedLogs).length > 1;
+  let hasLogs;
+  if (logJournalEnabled) {
+    hasLogs = consoleLines.length > 0;
+  } else {
+    const savedLogs = localStorage.getItem("graphite_logs");
+    hasLogs = savedLogs && JSON.parse(savedLogs).length > 1;
+  }
 
   const copyBtn = document.getElementById("copyLogsBtn");
   const exportBtn = document.getElementById("exportLogsBtn");
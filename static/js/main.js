@@ -39,26 +39,73 @@ document.addEventListener("DOMContentLoaded", function () {
     loadConfig();
   });
 
-  // Load saved logs from localStorage
-  loadLogsFromStorage();
+  // Load console history from the server journal or localStorage
+  loadLogHistory();
 
   // Set up auto-save listeners
   setupAutoSave();
+
+  // Subscribe to live updates
+  startEventStream();
 });
 
-// Poll status and logs every 2 seconds
-setInterval(async () => {
-  try {
-    const response = await fetch("/api/config");
-    const config = await response.json();
-    updateStatus(config.bot_running);
-  } catch (error) {
-    console.error("Failed to check status:", error);
+// Receive status, logs and stats as they happen
+function startEventStream() {
+  if (!window.EventSource) {
+    startPolling();
+    return;
   }
 
-  // Update console logs
-  updateConsole();
-}, 2000);
+  const source = new EventSource("/api/events");
+
+  source.addEventListener("status", (event) => {
+    const data = JSON.parse(event.data);
+    updateStatus(data.bot_running);
+  });
+
+  source.addEventListener("logs", (event) => {
+    const data = JSON.parse(event.data);
+    renderLogs(data.entries, data.last_seq);
+  });
+
+  source.addEventListener("log", (event) => {
+    const data = JSON.parse(event.data);
+    appendLogEntry(data);
+  });
+
+  source.addEventListener("stats", (event) => {
+    const data = JSON.parse(event.data);
+    applyMessageStatDelta(data);
+  });
+
+  source.addEventListener("stats_reset", (event) => {
+    const data = JSON.parse(event.data);
+    clearMessageStats(data.version);
+  });
+
+  source.onerror = () => {
+    // EventSource reconnects by itself; fall back only if it gave up
+    if (source.readyState === EventSource.CLOSED) {
+      startPolling();
+    }
+  };
+}
+
+// Fallback: poll status and logs every 2 seconds
+function startPolling() {
+  setInterval(async () => {
+    try {
+      const response = await fetch("/api/config");
+      const config = await response.json();
+      updateStatus(config.bot_running);
+    } catch (error) {
+      console.error("Failed to check status:", error);
+    }
+
+    // Update console logs
+    updateConsole();
+  }, 2000);
+}
 
 // Token Help Modal Functions
 function showTokenHelp() {
@@ -93,6 +140,7 @@ function closeShortcutsHelp() {
 function clearConsole() {
   const consoleWindow = document.getElementById("consoleWindow");
   consoleWindow.innerHTML = '<div class="log-entry">Console cleared.</div>';
+  consoleLines = [];
   localStorage.removeItem("graphite_logs");
   localStorage.removeItem("graphite_logs_timestamp");
   updateLogButtonsState();
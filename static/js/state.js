@@ -1,3 +1,6 @@
 let times = [];
 let messages = [];
 let currentMode = "spam";
+
+// Must match max_logs in auto_message.py
+const MAX_CONSOLE_LINES = 500;
@@ -1,4 +1,10 @@
 let messageStatsChart = null;
+// Message id -> { message, count, minutes, hours }, where minutes and hours
+// map bucket start times (Unix seconds) to counts
+let messageStats = {};
+// Server stats version (and epoch) this mirror is up to date with
+let statsVersion = 0;
+let statsEpoch = null;
 
 function initMessageStatsChart() {
   const ctx = document.getElementById("messageStatsChart");
@@ -107,11 +113,14 @@ function initMessageStatsChart() {
 
 async function loadMessageStats() {
   try {
-    const response = await fetch("/api/message-stats");
-    const data = await response.json();
+    // Only ask for what changed since the last load
+    const params = new URLSearchParams({ since: statsVersion });
+    if (statsEpoch) params.set("epoch", statsEpoch);
+    const response = await fetch(`/api/message-stats?${params}`);
+    applyStatsDelta(await response.json());
 
-    if (data.stats && Object.keys(data.stats).length > 0) {
-      updateMessageStatsChart(data.stats);
+    if (Object.keys(messageStats).length > 0) {
+      updateMessageStatsChart();
       showStatsPanel();
     } else {
       hideStatsPanel();
@@ -121,18 +130,88 @@ async function loadMessageStats() {
   }
 }
 
-function updateMessageStatsChart(stats) {
+function getMessageStat(id, message) {
+  if (!messageStats[id]) {
+    messageStats[id] = { message, count: 0, minutes: {}, hours: {} };
+  }
+  return messageStats[id];
+}
+
+function applyStatsDelta(data) {
+  if (data.reset) messageStats = {};
+
+  data.messages.forEach((changed) => {
+    const stat = getMessageStat(changed.id, changed.message);
+    stat.count = changed.count;
+    changed.minutes.forEach(([start, count]) => (stat.minutes[start] = count));
+    changed.hours.forEach(([start, count]) => (stat.hours[start] = count));
+  });
+
+  statsVersion = data.version;
+  statsEpoch = data.epoch;
+}
+
+function updateMessageStatsChart() {
   if (!messageStatsChart) {
     initMessageStatsChart();
   }
 
-  const sortedEntries = Object.entries(stats).sort((a, b) => b[1] - a[1]);
-  const labels = sortedEntries.map(([msg]) => msg);
-  const data = sortedEntries.map(([, count]) => count);
+  const sortedStats = Object.values(messageStats).sort(
+    (a, b) => b.count - a.count
+  );
 
-  messageStatsChart.data.labels = labels;
-  messageStatsChart.data.datasets[0].data = data;
+  messageStatsChart.data.labels = sortedStats.map((stat) => stat.message);
+  messageStatsChart.data.datasets[0].data = sortedStats.map(
+    (stat) => stat.count
+  );
   messageStatsChart.update();
+  updateMessageRates();
+}
+
+// Sum the buckets of every message that start within the last `seconds`
+function countSentSince(buckets, width, seconds) {
+  const cutoff = Date.now() / 1000 - seconds;
+  let total = 0;
+  Object.values(messageStats).forEach((stat) => {
+    Object.entries(stat[buckets]).forEach(([start, count]) => {
+      if (Number(start) + width > cutoff) total += count;
+    });
+  });
+  return total;
+}
+
+function updateMessageRates() {
+  const rates = document.getElementById("messageRates");
+  if (!rates) return;
+
+  const lastMinute = countSentSince("minutes", 60, 60);
+  const lastHour = countSentSince("minutes", 60, 3600);
+  const lastDay = countSentSince("hours", 3600, 86400);
+  rates.textContent =
+    `Sent in the last minute: ${lastMinute} · ` +
+    `last hour: ${lastHour} · last 24 hours: ${lastDay}`;
+}
+
+// Live count from the event stream; time buckets follow on the next load
+function applyMessageStatDelta(data) {
+  getMessageStat(data.id, data.message).count = data.count;
+
+  // Only redraw the chart when it is on screen
+  const panel = document.getElementById("statsPanel");
+  if (panel && panel.style.display !== "none") {
+    updateMessageStatsChart();
+  }
+}
+
+function clearMessageStats(version) {
+  messageStats = {};
+  if (version !== undefined) statsVersion = version;
+  hideStatsPanel();
+  if (messageStatsChart) {
+    messageStatsChart.data.labels = [];
+    messageStatsChart.data.datasets[0].data = [];
+    messageStatsChart.update();
+  }
 }
 
 function showStatsPanel() {
@@ -151,13 +230,9 @@ function hideStatsPanel() {
 
 async function resetMessageStats() {
   try {
-    await fetch("/api/message-stats", { method: "DELETE" });
-    hideStatsPanel();
-    if (messageStatsChart) {
-      messageStatsChart.data.labels = [];
-      messageStatsChart.data.datasets[0].data = [];
-      messageStatsChart.update();
-    }
+    const response = await fetch("/api/message-stats", { method: "DELETE" });
+    const result = await response.json();
+    clearMessageStats(result.version);
   } catch (error) {
     console.error("Failed to reset message stats:", error);
   }
@@ -0,0 +1,62 @@
+import pytest
+
+from build_assets import minify_css, minify_js
+
+
+@pytest.mark.parametrize(
+    "source, expected",
+    [
+        ("a {\n  color: red;\n}\n", "a{color:red}"),
+        ("/* note */ a > b , c { margin : 0 }", "a>b,c{margin :0}"),
+        ('a::after { content: "/* kept */  ;" }', 'a::after{content:"/* kept */  ;"}'),
+        ("a :hover { color: red }", "a :hover{color:red}"),
+    ],
+)
+def test_minify_css(source, expected):
+    assert minify_css(source) == expected
+
+
+@pytest.mark.parametrize(
+    "source, expected",
+    [
+        # Comments go, strings stay as they are
+        ('// note\nlet a = "x  //  y"; /* c */ b()', 'let a="x  //  y";b()'),
+        # Regular expressions after punctuation and after keywords
+        ("x = /a = b/g.test(s)", "x=/a = b/g.test(s)"),
+        ("return /a = b/.test(s)", "return /a = b/.test(s)"),
+        ('if (typeof /"/ === y) {}', 'if(typeof /"/===y){}'),
+        ("return /[/]'/.test(s)", "return /[/]'/.test(s)"),
+        # Division
+        ("a = b / c / d", "a=b / c / d"),
+        ("a = (b) / 2", "a=(b)/ 2"),
+        # Template literals, including nested ones and braces inside ${...}
+        ("s = `a  ${ b / 2 }  c`", "s=`a  ${b / 2}  c`"),
+        ("s = `${ {a: 1}.a } ${`n ${ x }`}`", "s=`${{a:1}.a} ${`n ${x}`}`"),
+        # Line breaks that automatic semicolon insertion depends on stay
+        ("let a = 1\nlet b = 2", "let a=1\nlet b=2"),
+        ("return\nx", "return\nx"),
+        ("a = b\n++c", "a=b\n++c"),
+        ("f({\n  a: 1,\n  b: 2\n})", "f({a:1,b:2})"),
+    ],
+)
+def test_minify_js(source, expected):
+    assert minify_js(source) == expected
+
+
+@pytest.mark.parametrize(
+    "source, what",
+    [
+        ('x = "abc', "string"),
+        ("x = 'abc\ny'", "string"),
+        ("x = `a ${b}", "template literal"),
+        ("/* never closed", "comment"),
+        ("return /abc\n", "regular expression"),
+        ('return /"/', None),
+    ],
+)
+def test_minify_js_unterminated(source, what):
+    if what is None:
+        assert minify_js(source) == 'return /"/'
+        return
+    with pytest.raises(ValueError, match=f"Unterminated {what} starting on line"):
+        minify_js(source)
@@ -0,0 +1,98 @@
+import os
+
+from log_journal import INDEX_ENTRY, LogJournal, SessionJournal
+
+
+def fill(journal, count, start=0):
+    for index in range(start, start + count):
+        journal.append(1000.0 + index, "info", "bot", f"line {index}")
+
+
+def messages(records):
+    return [record[4] for record in records]
+
+
+def test_rotates_into_segments_and_drops_the_oldest(tmp_path):
+    journal = SessionJournal(str(tmp_path), max_segment_bytes=200, max_segments=3)
+    fill(journal, 30)
+    journal.close()
+
+    logs = sorted(name for name in os.listdir(tmp_path) if name.endswith(".log"))
+    assert len(logs) == 3
+    assert all(os.path.getsize(tmp_path / name) <= 200 for name in logs)
+    # Records keep their sequence numbers across segments
+    records = journal.tail(1000)
+    assert records[-1][0] == 30
+    assert [record[0] for record in records] == list(
+        range(records[0][0], records[-1][0] + 1)
+    )
+
+
+def test_tail_and_range_reads_across_segments(tmp_path):
+    journal = SessionJournal(str(tmp_path), max_segment_bytes=200, max_segments=100)
+    fill(journal, 30)
+
+    assert messages(journal.tail(7)) == [f"line {i}" for i in range(23, 30)]
+    assert messages(journal.tail(100)) == [f"line {i}" for i in range(30)]
+    assert messages(journal.read(since=1005, until=1017)) == [
+        f"line {i}" for i in range(5, 17)
+    ]
+    assert messages(journal.read(since=1005, limit=4)) == [
+        f"line {i}" for i in range(5, 9)
+    ]
+    assert messages(journal.read(until=1003)) == ["line 0", "line 1", "line 2"]
+    assert list(journal.read(since=2000)) == []
+
+
+def test_recovers_from_a_partial_write(tmp_path):
+    journal = SessionJournal(str(tmp_path), max_segment_bytes=10**6, max_segments=4)
+    fill(journal, 5)
+    journal.close()
+
+    # A crash after the index entry but mid-way through the record
+    log_path = tmp_path / "000000000001.log"
+    index_path = tmp_path / "000000000001.idx"
+    with open(index_path, "ab") as f:
+        f.write(INDEX_ENTRY.pack(1005.0, os.path.getsize(log_path)))
+    with open(log_path, "ab") as f:
+        f.write(b'[1005.0,"info","bot","line')
+
+    journal = SessionJournal(str(tmp_path), max_segment_bytes=10**6, max_segments=4)
+    assert messages(journal.tail(10)) == [f"line {i}" for i in range(5)]
+    assert os.path.getsize(index_path) == 5 * INDEX_ENTRY.size
+
+    fill(journal, 1, start=5)
+    assert journal.tail(1) == [(6, 1005.0, "info", "bot", "line 5")]
+
+
+def test_recovers_from_an_index_entry_without_its_record(tmp_path):
+    journal = SessionJournal(str(tmp_path), max_segment_bytes=10**6, max_segments=4)
+    fill(journal, 3)
+    journal.close()
+    with open(tmp_path / "000000000001.idx", "ab") as f:
+        f.write(INDEX_ENTRY.pack(1003.0, 10**6))
+        f.write(b"\0" * 5)
+
+    journal = SessionJournal(str(tmp_path), max_segment_bytes=10**6, max_segments=4)
+    assert messages(journal.tail(10)) == ["line 0", "line 1", "line 2"]
+
+
+def test_reads_of_unknown_sessions_create_nothing(tmp_path):
+    journals = LogJournal(str(tmp_path))
+    assert journals.tail("missing", 10) == []
+    assert list(journals.read("missing")) == []
+    assert os.listdir(tmp_path) == []
+
+
+def test_prunes_least_recently_written_sessions(tmp_path):
+    journals = LogJournal(str(tmp_path), max_open=2, max_sessions=10)
+    for index in range(11):
+        journals.append(f"session-{index:02d}", 1000.0, "info", "bot", "line")
+        # Spread the modification times, which decide what is pruned
+        path = tmp_path / f"session-{index:02d}" / "000000000001.log"
+        os.utime(path, (1000 + index, 1000 + index))
+
+    remaining = sorted(os.listdir(tmp_path))
+    assert len(remaining) == 9
+    assert "session-00" not in remaining and "session-10" in remaining
+    assert len(journals._journals) == 2
@@ -0,0 +1,58 @@
+import threading
+
+from auto_message import SessionStore
+
+
+def make_session(bot_running=False, subscribers=()):
+    return lambda session_id: {
+        "bot_running": bot_running,
+        "subscribers": list(subscribers),
+        "lock": threading.RLock(),
+    }
+
+
+def test_evicts_least_recently_used_when_full():
+    store = SessionStore(2, 1000, shard_count=1)
+    store.get_or_create("a", make_session())
+    store.get_or_create("b", make_session())
+    store.get_or_create("a", make_session())
+    store.get_or_create("c", make_session())
+    assert "b" not in store
+    assert "a" in store and "c" in store
+
+
+def test_keeps_new_session_when_protected_sessions_fill_the_shard():
+    store = SessionStore(2, 1000, shard_count=1)
+    store.get_or_create("a", make_session(bot_running=True))
+    store.get_or_create("b", make_session(subscribers=["stream"]))
+
+    data = store.get_or_create("c", make_session())
+
+    assert store["c"] is data
+    assert {"a", "b", "c"} <= {session_id for session_id, _ in store.items()}
+    # Once a protected session is released, the shard shrinks back
+    store["a"]["bot_running"] = False
+    store.get_or_create("c", make_session())
+    assert "a" not in store
+    assert len(store) == 2
+
+
+def test_refreshed_session_is_not_evicted():
+    store = SessionStore(1, 1000, shard_count=1)
+    store.get_or_create("a", make_session(bot_running=True))
+    store.get_or_create("b", make_session())
+    assert store.get_or_create("b", make_session()) is store["b"]
+
+
+def test_evict_drops_idle_sessions_in_every_shard():
+    store = SessionStore(100, 60, shard_count=4)
+    for session_id in ("a", "b", "c", "d", "e", "running"):
+        store.get_or_create(session_id, make_session())
+    store["running"]["bot_running"] = True
+    for _, session_data in store.items():
+        session_data["last_seen"] -= 120
+
+    evicted = store.evict()
+
+    assert sorted(evicted) == ["a", "b", "c", "d", "e"]
+    assert [session_id for session_id, _ in store.items()] == ["running"]
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from auto_message import max_simulation_entries, simulate
+
+START = datetime(2026, 1, 1, 12, 0)
+
+
+def send_times(result):
+    return [
+        datetime.fromisoformat(entry["time"])
+        for entry in result["timeline"]
+        if entry["event"] == "send"
+    ]
+
+
+def test_spam_sends_every_interval():
+    config = {"mode": "spam", "messages": ["a", "b"], "spam_interval": 600}
+    result = simulate(config, 3600, START, seed=1)
+
+    assert send_times(result) == [START + timedelta(minutes=10 * i) for i in range(6)]
+    assert result["sends"] == 6
+    assert result["end"] == "2026-01-01T13:00:00"
+    assert not result["truncated"]
+    assert {entry["message"] for entry in result["timeline"]} <= {"a", "b"}
+
+
+def test_spam_applies_delay_before_each_send():
+    config = {
+        "mode": "spam",
+        "messages": ["a"],
+        "spam_interval": 600,
+        "delay_enabled": True,
+        "min_delay": 5,
+        "max_delay": 5,
+    }
+    timeline = simulate(config, 1800, START, seed=1)["timeline"]
+
+    assert [entry["event"] for entry in timeline] == ["delay", "send"] * 3
+    assert timeline[1]["time"] == "2026-01-01T12:00:05"
+
+
+def test_scheduled_sends_at_send_times_and_wraps_to_tomorrow():
+    config = {"mode": "scheduled", "messages": ["a"], "send_times": ["13:30", "09:00"]}
+    result = simulate(config, 24 * 3600, START, seed=1)
+
+    assert send_times(result) == [
+        datetime(2026, 1, 1, 13, 30),
+        datetime(2026, 1, 2, 9, 0),
+    ]
+
+
+def test_random_window_crossing_midnight():
+    config = {
+        "mode": "random_window",
+        "messages": ["a"],
+        "window_start": "23:00",
+        "window_end": "01:00",
+        "messages_count": 4,
+    }
+    times = send_times(simulate(config, 24 * 3600, START, seed=1))
+
+    assert len(times) == 4
+    assert times == sorted(times)
+    assert all(
+        datetime(2026, 1, 1, 23) <= time <= datetime(2026, 1, 2, 1) for time in times
+    )
+    assert any(time.day == 2 for time in times)
+
+
+def test_random_window_is_reproducible_with_a_seed():
+    config = {
+        "mode": "random_window",
+        "messages": ["a", "b", "c"],
+        "window_start": "13:00",
+        "window_end": "14:00",
+        "messages_count": 5,
+    }
+    first = simulate(config, 24 * 3600, START, seed="s")
+    second = simulate(config, 24 * 3600, START, seed="s")
+
+    assert first["timeline"] == second["timeline"]
+
+
+def test_entry_limit_truncates_the_run():
+    config = {"mode": "spam", "messages": ["a"], "spam_interval": 1}
+    result = simulate(config, 7 * 24 * 3600, START, seed=1)
+
+    assert result["truncated"]
+    assert result["sends"] == max_simulation_entries
+
+
+def test_aware_start_is_converted_to_local_time():
+    aware = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+    config = {"mode": "scheduled", "messages": ["a"], "send_times": ["10:00"]}
+    result = simulate(config, 24 * 3600, aware, seed=1)
+
+    assert result["start"] == aware.astimezone().replace(tzinfo=None).isoformat()
+    assert result["sends"] == 1
+
+
+@pytest.mark.parametrize(
+    "config, start",
+    [
+        ({"mode": "spam", "messages": []}, START),
+        ({"mode": "scheduled", "messages": ["a"], "send_times": ["25:00"]}, START),
+        (
+            {"mode": "random_window", "messages": ["a"], "messages_count": 10**6},
+            START,
+        ),
+        ({"mode": "spam", "messages": ["a"]}, datetime(9999, 12, 31, 23)),
+    ],
+)
+def test_rejects_configs_that_cannot_run(config, start):
+    with pytest.raises(ValueError):
+        simulate(config, 3600, start)
@@ -0,0 +1,72 @@
+import json
+import os
+import time
+
+from snapshot import HEADER, MAGIC, SnapshotStore
+
+
+def encoded(state):
+    return json.dumps(state).encode()
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "snap")
+    now = time.time()
+    SnapshotStore(path).save(
+        {"secret_key": "k"},
+        [("a", now, encoded({"logs": [1, 2]})), ("b", now, encoded({"x": "é"}))],
+    )
+
+    store = SnapshotStore(path)
+    assert store.meta == {"secret_key": "k"}
+    assert store.load("a") == {"logs": [1, 2]}
+    assert store.load("b") == {"x": "é"}
+    assert store.load("missing") is None
+
+
+def test_carries_over_unsaved_sessions_until_max_age(tmp_path):
+    path = str(tmp_path / "snap")
+    now = time.time()
+    SnapshotStore(path).save({}, [("old", now - 100, b"{}"), ("kept", now, b"{}")])
+
+    store = SnapshotStore(path, max_age=50)
+    store.save({}, [("new", now, b"{}")])
+
+    store = SnapshotStore(path)
+    assert store.load("new") == {} and store.load("kept") == {}
+    assert store.load("old") is None
+
+
+def test_truncated_file_is_ignored(tmp_path):
+    path = str(tmp_path / "snap")
+    SnapshotStore(path).save({"secret_key": "k"}, [("a", time.time(), b"{}")])
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 3)
+
+    store = SnapshotStore(path)
+    assert store.meta == {}
+    assert store.load("a") is None
+
+
+def test_other_files_are_ignored(tmp_path):
+    path = tmp_path / "snap"
+    path.write_bytes(HEADER.pack(b"NOTSNAP!", 0, 0))
+    assert SnapshotStore(str(path)).meta == {}
+
+    path.write_bytes(MAGIC[:4])
+    assert SnapshotStore(str(path)).meta == {}
+
+
+def test_corrupt_entry_is_dropped(tmp_path):
+    path = str(tmp_path / "snap")
+    now = time.time()
+    SnapshotStore(path).save({}, [("a", now, encoded({"n": 1}))])
+    data = bytearray(open(path, "rb").read())
+    data[-4] ^= 0xFF
+    with open(path, "wb") as f:
+        f.write(data)
+
+    store = SnapshotStore(path)
+    assert store.load("a") is None
+    store.save({}, [])
+    assert SnapshotStore(path).load("a") is None